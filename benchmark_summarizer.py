@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+摘要后端延迟基准：截断 / 抽取式（纯 Python、NumPy）/ Gemini 对比
+
+用法:
+  python benchmark_summarizer.py             # 使用 fixtures/posts 与 fixtures/feeds 下的样本
+  python benchmark_summarizer.py -n 20       # 本地后端每条样本重复次数
+  python benchmark_summarizer.py -g 5        # Gemini 最多调用条数（需设置 GEMINI_API_KEY，不使用缓存）
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+import extractive_summarizer
+from feed_parser import parse_feed
+from summarizer import _generate_summary, summarize_extractive, truncate_text
+
+FIXTURE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_samples():
+    """样本：(标题, 正文) 列表"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_ROOT, 'posts', '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            samples.extend((p['title'], p['selftext']) for p in json.load(f))
+    for path in sorted(glob.glob(os.path.join(FIXTURE_ROOT, 'feeds', '*.xml'))):
+        with open(path, 'rb') as f:
+            samples.extend((item['title'], item['description']) for item in parse_feed(f.read()) if item.get('description'))
+    return samples
+
+
+def measure(fn, samples, iterations: int):
+    """返回每条样本单次调用的耗时列表（毫秒）"""
+    latencies = []
+    for title, text in samples:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(title, text)
+        latencies.append((time.perf_counter() - start) * 1000 / iterations)
+    return latencies
+
+
+def report(name: str, latencies):
+    p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{name:<24}{len(latencies):>6}{statistics.mean(latencies):>12.3f}{statistics.median(latencies):>12.3f}{p95:>12.3f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='摘要后端延迟基准')
+    arg_parser.add_argument('-n', '--iterations', type=int, default=10, help='本地后端每条样本重复次数')
+    arg_parser.add_argument('-g', '--gemini-calls', type=int, default=5, help='Gemini 最多调用条数')
+    args = arg_parser.parse_args()
+
+    samples = load_samples()
+    if not samples:
+        print(f"❌ 未找到样本: {FIXTURE_ROOT}")
+        return 1
+
+    print(f"{'后端':<24}{'样本':>6}{'平均 ms':>12}{'中位 ms':>12}{'P95 ms':>12}")
+    print('-' * 66)
+    report('truncate', measure(truncate_text, samples, args.iterations))
+
+    def extractive(use_numpy):
+        return lambda title, text: extractive_summarizer.extractive_summary(text, use_numpy=use_numpy) or truncate_text(title, text)
+
+    report('extractive (python)', measure(extractive(False), samples, args.iterations))
+    if extractive_summarizer.np is not None:
+        report('extractive (numpy)', measure(extractive(True), samples, args.iterations))
+    else:
+        print("ℹ️ 未安装 numpy，跳过 NumPy 实现")
+
+    api_key = os.getenv('GEMINI_API_KEY')
+    if api_key and args.gemini_calls > 0:
+        try:
+            report('gemini', measure(lambda title, text: _generate_summary(title, text, api_key), samples[:args.gemini_calls], 1))
+        except Exception as e:
+            print(f"❌ Gemini 调用失败: {e}")
+    else:
+        print("ℹ️ 未设置 GEMINI_API_KEY，跳过 Gemini")
+
+    print('-' * 66)
+    title, text = samples[0]
+    print(f"示例: {title}")
+    print(f"  truncate:   {truncate_text(title, text)}")
+    print(f"  extractive: {summarize_extractive(title, text)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""
+布隆过滤器
+用于在查询 SQLite 去重表之前快速排除"一定未推送过"的键：过滤器回答"不存在"时一定不存在，
+回答"可能存在"时再查数据库。位数组连同元数据一起持久化到文件，下次运行直接加载
+"""
+
+import hashlib
+import json
+import math
+import os
+import struct
+from typing import Dict, Iterable, Optional
+
+MAGIC = b'BLM1'
+
+
+class BloomFilter:
+    """按容量与误判率确定位数 m 与哈希数 k，使用双重哈希生成 k 个位置"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.meta: Dict[str, int] = {}
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: str):
+        """写入文件（先写临时文件再替换，避免中途失败留下损坏的文件）"""
+        header = json.dumps({
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'num_bits': self.num_bits,
+            'num_hashes': self.num_hashes,
+            'count': self.count,
+            'meta': self.meta,
+        }).encode('utf-8')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BloomFilter']:
+        """从文件加载；文件不存在或格式不正确时返回 None"""
+        try:
+            with open(path, 'rb') as f:
+                if f.read(4) != MAGIC:
+                    return None
+                (header_len,) = struct.unpack('<I', f.read(4))
+                header = json.loads(f.read(header_len).decode('utf-8'))
+                bits = f.read()
+            # 头部缺少字段或类型不对（例如不是 JSON 对象）同样视为格式不正确
+            bloom = cls(header['capacity'], header['error_rate'])
+            if bloom.num_bits != header['num_bits'] or len(bits) != len(bloom.bits):
+                return None
+            bloom.num_hashes = int(header['num_hashes'])
+            bloom.count = int(header['count'])
+            meta = header.get('meta', {})
+            if bloom.num_hashes < 1 or not isinstance(meta, dict):
+                return None
+        except (OSError, ValueError, struct.error, KeyError, TypeError):
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.meta = meta
+        return bloom
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 import json
 import time
-import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+import http_client
+from datetime import datetime
+from feed_parser import iter_response_items
 
 def log(msg):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
@@ -31,56 +31,24 @@ def main():
                 sources.append((f"Twitter-{handle}", f"{base}/{handle}/rss"))
 
     report = []
-    freshness_cutoff = datetime.utcnow() - timedelta(hours=24)
+    freshness_cutoff = time.time() - 24 * 3600
 
     for name, url in sources:
         try:
-            r = requests.get(url, timeout=10, headers={'User-Agent':'Mozilla/5.0','Accept':'application/rss+xml,application/xml,text/xml,*/*'})
+            r = http_client.get(url, timeout=10, stream=True, headers={'User-Agent':'Mozilla/5.0','Accept':'application/rss+xml,application/xml,text/xml,*/*'})
             ok = r.status_code == 200
             if ok:
                 try:
-                    root = ET.fromstring(r.text)
-                    # 新鲜度检查：若存在 pubDate/updated，至少有一条在24h内
-                    fresh_ok = True
-                    try:
-                        items = root.findall('.//item') or root.findall('.//entry')
-                        fresh_found = False
-                        for item in items[:10]:  # 采样前10条
-                            for tag in ('pubDate', '{http://www.w3.org/2005/Atom}updated', 'updated', 'date'):
-                                elem = item.find(tag)
-                                if elem is not None and elem.text:
-                                    try:
-                                        # 粗略多格式解析
-                                        txt = elem.text.strip()
-                                        # 常见 RSS/HTTP 日期格式
-                                        from email.utils import parsedate_to_datetime
-                                        dt = None
-                                        try:
-                                            dt = parsedate_to_datetime(txt)
-                                        except Exception:
-                                            pass
-                                        if dt is None:
-                                            # ISO
-                                            try:
-                                                dt = datetime.fromisoformat(txt.replace('Z', '+00:00'))
-                                            except Exception:
-                                                pass
-                                        if dt and dt.tzinfo:
-                                            dt = dt.astimezone(tz=None).replace(tzinfo=None)
-                                        if dt and dt >= freshness_cutoff:
-                                            fresh_found = True
-                                            break
-                                    except Exception:
-                                        continue
-                            if fresh_found:
-                                break
-                        fresh_ok = fresh_found  # 要求至少一条为24h内
-                    except Exception:
-                        fresh_ok = True  # 没法解析时不因新鲜度直接判死
+                    # 流式解析，只读取采样所需的前10条
+                    items = list(iter_response_items(r, limit=10))
+                    # 新鲜度检查：至少一条在24h内（发布时间由 feed_parser 统一解析为时间戳）
+                    fresh_ok = any(item['published_ts'] >= freshness_cutoff for item in items)
 
                     ok = ok and fresh_ok
                 except Exception as e:
                     ok = False
+            else:
+                r.close()
             report.append((name, url, ok, r.status_code))
             time.sleep(0.5)
         except Exception as e:
@@ -0,0 +1,239 @@
+"""
+去重模块
+- 去重键：规范化 URL（去除跟踪参数、统一协议与主机名）与标题内容指纹，
+  使同一条新闻在链接带参数、http/https、www 前缀或标题大小写标点不同时仍能被识别为重复
+- 近似重复聚类：词 shingle 的 MinHash 签名 + LSH 分桶，只比较同桶候选，
+  将不同来源转载的同一篇报道聚为一簇并按来源权重选出代表条目
+"""
+
+import hashlib
+import random
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 不影响内容的跟踪参数（各站点通用、含义明确的键）
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    'cmpid', 'smid', 'ocid',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# 仅在特定站点上表示跟踪/分享来源的通用键（如 s、t 在其他站点可能是文章 ID 或时间戳）
+HOST_TRACKING_PARAMS = {
+    'twitter.com': {'s', 't', 'ref_src', 'ref_url'},
+    'x.com': {'s', 't', 'ref_src', 'ref_url'},
+    'youtube.com': {'si', 'feature'},
+    'youtu.be': {'si', 'feature'},
+    'reddit.com': {'share_id', 'ref', 'ref_source'},
+}
+
+# 同一站点的镜像/移动端子域名
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.', 'old.', 'new.', 'np.')
+
+# 标题指纹忽略的常见虚词
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'at', 'by', 'with',
+    'from', 'as', 'is', 'are', 'was', 'were', 'be', 'its', 'it', 'that', 'this',
+}
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def canonicalize_url(url: Optional[str]) -> str:
+    """
+    规范化 URL：统一 https、主机名小写并去掉 www./m. 等前缀、去掉默认端口、
+    移除跟踪参数与片段、其余参数排序、去掉末尾斜杠；无法解析时原样返回
+    """
+    if not url:
+        return ''
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+
+    host = (parts.hostname or '').lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    host_params = HOST_TRACKING_PARAMS.get(host, ())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and k.lower() not in host_params
+        and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+
+def title_tokens(title: Optional[str]) -> List[str]:
+    """标题分词：小写、去标点、去虚词"""
+    return [t for t in _TOKEN_RE.findall((title or '').lower()) if t not in STOPWORDS]
+
+
+def content_fingerprint(title: Optional[str]) -> str:
+    """
+    标题内容指纹：去虚词后的词序列哈希（16 位十六进制）
+    大小写、标点或虚词不同的标题得到相同指纹；词序保留（"US sanctions China" 与
+    "China sanctions US" 不同），改写语序的转载由近似重复聚类处理；标题为空时返回空串
+    """
+    tokens = title_tokens(title)
+    if not tokens:
+        return ''
+    return hashlib.blake2b(' '.join(tokens).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def dedup_keys(item: Dict) -> List[str]:
+    """条目的去重键：'url:' + 规范化 URL、'fp:' + 标题指纹（缺失的键省略）"""
+    keys = []
+    url = canonicalize_url(item.get('url'))
+    if url:
+        keys.append(f"url:{url}")
+    fingerprint = content_fingerprint(item.get('title'))
+    if fingerprint:
+        keys.append(f"fp:{fingerprint}")
+    return keys
+
+
+# MinHash 使用的梅森素数模数
+_MERSENNE_PRIME = (1 << 61) - 1
+# 参与 shingle 的正文词数上限
+SHINGLE_BODY_TOKENS = 60
+
+
+def shingles(text: Optional[str], k: int = 2) -> Set[str]:
+    """词级 k-shingle 集合（去虚词）；词数不足 k 时退化为单词集合"""
+    tokens = title_tokens(text)
+    if len(tokens) < k:
+        return set(tokens)
+    return {' '.join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class MinHasher:
+    """MinHash 签名：num_perm 个 (a*x+b) mod p 形式的随机哈希，签名相同位置的比例估计 Jaccard 相似度"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingle_set: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        """计算签名；shingle 集合为空时返回 None"""
+        hashes = [_hash64(s) for s in shingle_set]
+        if not hashes:
+            return None
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """估计的 Jaccard 相似度"""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class LSHIndex:
+    """
+    MinHash 签名的 LSH 分桶索引：签名切分为 bands 段，任一段完全相同的条目成为候选对
+    相似度阈值约为 (1/bands) ** (1/rows)
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+
+    def query_insert(self, key: int, signature: Tuple[int, ...]) -> Set[int]:
+        """返回与 signature 同桶的已有条目，并将其加入索引"""
+        candidates: Set[int] = set()
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            bucket = buckets.setdefault(signature[start:start + self.rows], [])
+            candidates.update(bucket)
+            bucket.append(key)
+        return candidates
+
+
+def cluster_near_duplicates(
+    items: List[Dict],
+    *,
+    text_of: Callable[[Dict], str],
+    weight_of: Callable[[Dict], float],
+    threshold: float = 0.5,
+    num_perm: int = 64,
+    bands: int = 16,
+) -> List[Dict]:
+    """
+    近似重复聚类：返回每簇的代表条目（保持原顺序）
+
+    代表条目为簇内 weight_of 最大者（相同时取靠前者），并写入
+    cluster_id、cluster_size、cluster_members（其余条目的 source/title/url）；
+    簇内其余条目写入 cluster_id 与 duplicate_of（代表条目的 url）
+
+    Args:
+        items: 条目列表
+        text_of: 返回用于比较的文本（如标题 + 正文开头）
+        weight_of: 返回来源权重
+        threshold: 估计 Jaccard 相似度阈值
+        num_perm: MinHash 签名长度，需能被 bands 整除
+        bands: LSH 分段数
+    """
+    hasher = MinHasher(num_perm)
+    index = LSHIndex(bands, num_perm // bands)
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures: List[Optional[Tuple[int, ...]]] = []
+    for i, item in enumerate(items):
+        sig = hasher.signature(shingles(text_of(item)))
+        signatures.append(sig)
+        if sig is None:
+            continue
+        for j in index.query_insert(i, sig):
+            if find(i) != find(j) and MinHasher.similarity(sig, signatures[j]) >= threshold:
+                parent[find(i)] = find(j)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        clusters.setdefault(find(i), []).append(i)
+
+    representatives = []
+    for members in clusters.values():
+        rep_index = max(members, key=lambda i: (weight_of(items[i]), -i))
+        rep = items[rep_index]
+        cluster_id = content_fingerprint(rep.get('title')) or canonicalize_url(rep.get('url')) or str(rep_index)
+        rep['cluster_id'] = cluster_id
+        rep['cluster_size'] = len(members)
+        rep['cluster_members'] = [
+            {'source': items[i].get('source') or items[i].get('subreddit'), 'title': items[i].get('title'), 'url': items[i].get('url')}
+            for i in members if i != rep_index
+        ]
+        for i in members:
+            if i != rep_index:
+                items[i]['cluster_id'] = cluster_id
+                items[i]['duplicate_of'] = rep.get('url')
+        representatives.append(rep_index)
+    return [items[i] for i in sorted(representatives)]
+
+
+def near_duplicate_text(item: Dict, body_key: str = 'content') -> str:
+    """聚类比较文本：标题 + 正文前 SHINGLE_BODY_TOKENS 个词"""
+    body = ' '.join((item.get(body_key) or '').split()[:SHINGLE_BODY_TOKENS])
+    return f"{item.get('title') or ''} {body}"
@@ -0,0 +1,20 @@
+"""
+环境变量读取
+在调用时读取（入口脚本加载 .env 之后同样生效）；取值缺失或格式错误时返回默认值，不抛出异常
+"""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,159 @@
+"""
+本地抽取式摘要
+TextRank：句子按 TF-IDF 向量两两计算余弦相似度构图，PageRank 迭代得到句子得分，
+按得分选句并按原文顺序拼接。离线运行、无调用费用；安装 NumPy 时用矩阵运算，否则使用纯 Python 实现
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence
+
+from dedup import STOPWORDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 参与排序的句子数上限（相似度矩阵为 O(n²)）
+MAX_SENTENCES = 60
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# 句末：中文句号/问号/叹号之后，或英文句号/问号/叹号后跟空白处
+_SENTENCE_END_RE = re.compile(r'(?<=[。！？])\s*|(?<=[.!?])\s+')
+_WORD_RE = re.compile(r'[a-z0-9]+(?:[\'’][a-z]+)?|[一-鿿]+')
+_CJK_RE = re.compile(r'[一-鿿]')
+
+
+def split_sentences(text: Optional[str]) -> List[str]:
+    """按中英文句末标点与换行切分句子，去掉空白句"""
+    sentences = []
+    for line in (text or '').splitlines():
+        for part in _SENTENCE_END_RE.split(line):
+            sentence = ' '.join(part.split())
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+def sentence_terms(sentence: str) -> List[str]:
+    """句子分词：英文单词（去虚词）与中文字二元组"""
+    terms = []
+    for token in _WORD_RE.findall(sentence.lower()):
+        if _CJK_RE.match(token):
+            terms.extend(token[i:i + 2] for i in range(max(1, len(token) - 1)))
+        elif token not in STOPWORDS and len(token) > 1:
+            terms.append(token)
+    return terms
+
+
+def tfidf_vectors(term_lists: Sequence[List[str]]) -> List[Dict[str, float]]:
+    """每个句子的 L2 归一化 TF-IDF 稀疏向量"""
+    df: Dict[str, int] = {}
+    for terms in term_lists:
+        for term in set(terms):
+            df[term] = df.get(term, 0) + 1
+    n = len(term_lists)
+    vectors = []
+    for terms in term_lists:
+        vector: Dict[str, float] = {}
+        for term in terms:
+            vector[term] = vector.get(term, 0.0) + 1.0
+        for term, tf in vector.items():
+            vector[term] = tf * math.log(1 + n / df[term])
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        vectors.append({t: w / norm for t, w in vector.items()} if norm else {})
+    return vectors
+
+
+def _textrank_numpy(vectors: List[Dict[str, float]]) -> List[float]:
+    vocab = {term: i for i, term in enumerate({t for v in vectors for t in v})}
+    matrix = np.zeros((len(vectors), max(1, len(vocab))))
+    for row, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            matrix[row, vocab[term]] = weight
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    n = len(vectors)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # 行归一化为转移矩阵；无出边的句子视为均匀指向所有句子
+    transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1.0 / n), where=out_weight > 0)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores.tolist()
+
+
+def _textrank_python(vectors: List[Dict[str, float]]) -> List[float]:
+    n = len(vectors)
+    edges: List[Dict[int, float]] = [{} for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            small, large = (vectors[i], vectors[j]) if len(vectors[i]) <= len(vectors[j]) else (vectors[j], vectors[i])
+            sim = sum(w * large.get(t, 0.0) for t, w in small.items())
+            if sim > 0:
+                edges[i][j] = edges[j][i] = sim
+    out_weight = [sum(e.values()) for e in edges]
+    scores = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        dangling = sum(scores[i] for i in range(n) if not out_weight[i]) / n
+        updated = []
+        for i in range(n):
+            incoming = sum(scores[j] * w / out_weight[j] for j, w in edges[i].items())
+            updated.append((1 - DAMPING) / n + DAMPING * (incoming + dangling))
+        delta = sum(abs(a - b) for a, b in zip(updated, scores))
+        scores = updated
+        if delta < TOLERANCE:
+            break
+    return scores
+
+
+def textrank_scores(sentences: Sequence[str], use_numpy: Optional[bool] = None) -> List[float]:
+    """
+    句子 TextRank 得分
+
+    Args:
+        sentences: 句子列表
+        use_numpy: 是否使用 NumPy 实现；缺省时安装了 NumPy 即使用
+    """
+    if not sentences:
+        return []
+    vectors = tfidf_vectors([sentence_terms(s) for s in sentences])
+    if use_numpy is None:
+        use_numpy = np is not None
+    return _textrank_numpy(vectors) if use_numpy and np is not None else _textrank_python(vectors)
+
+
+def extractive_summary(text: Optional[str], max_length: int = 150, use_numpy: Optional[bool] = None) -> str:
+    """
+    抽取式摘要：按 TextRank 得分从高到低选句（得分相同取靠前者），总长不超过 max_length，
+    再按原文顺序拼接；得分最高的句子本身超长时截断。文本为空时返回空串
+    """
+    sentences = split_sentences(text)[:MAX_SENTENCES]
+    if not sentences:
+        return ''
+    if len(sentences) == 1:
+        chosen = [0]
+    else:
+        scores = textrank_scores(sentences, use_numpy=use_numpy)
+        chosen, length = [], 0
+        for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+            added = len(sentences[i]) + (1 if chosen else 0)
+            if length + added <= max_length:
+                chosen.append(i)
+                length += added
+        if not chosen:
+            chosen = [max(range(len(sentences)), key=lambda i: (scores[i], -i))]
+    summary = ''
+    for i in sorted(chosen):
+        # 中文句子之间不加空格
+        summary += sentences[i] if not summary or summary.endswith(('。', '！', '？')) else ' ' + sentences[i]
+    if len(summary) > max_length:
+        summary = summary[:max_length - 3].rstrip() + '...'
+    return summary
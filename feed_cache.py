@@ -0,0 +1,153 @@
+"""
+RSS 条件请求缓存
+按 URL 持久化 ETag / Last-Modified 以及上次解析出的条目，
+请求时携带 If-None-Match / If-Modified-Since，304 时直接复用缓存条目
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import http_client
+from feed_parser import CHUNK_SIZE
+
+
+class FeedCache:
+    """RSS 校验信息与解析结果的持久化存储：单个长连接（WAL 模式），可在多个抓取线程间共享"""
+
+    def __init__(self, db_path: str = "feed_cache.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.init_db()
+
+    def init_db(self):
+        """初始化数据库"""
+        with self._lock, self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS feed_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    url TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    items TEXT,
+                    fetched_at INTEGER
+                )
+            ''')
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """读取缓存记录：etag、last_modified、items"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, items FROM feed_cache WHERE cache_key = ?',
+                (cache_key,),
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            items = json.loads(row[2]) if row[2] else []
+        except ValueError:
+            items = []
+        return {'etag': row[0], 'last_modified': row[1], 'items': items}
+
+    def put(self, cache_key: str, url: str, etag: Optional[str], last_modified: Optional[str], items: List[Dict]):
+        """保存校验信息与解析后的条目"""
+        payload = json.dumps(items, ensure_ascii=False, default=str)
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO feed_cache
+                (cache_key, url, etag, last_modified, items, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (cache_key, url, etag, last_modified, payload, int(time.time())))
+
+    def cleanup(self, max_age_days: int = 7):
+        """清理长期未更新的记录"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM feed_cache WHERE fetched_at < ?', (int(time.time()) - max_age_days * 86400,))
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self.conn.close()
+
+
+_default_cache: Optional[FeedCache] = None
+_default_lock = threading.Lock()
+
+
+def get_feed_cache() -> FeedCache:
+    """获取默认的 FeedCache 实例"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FeedCache()
+    return _default_cache
+
+
+def fetch_feed(
+    url: str,
+    parser: Callable[[Iterable[bytes]], List[Dict]],
+    *,
+    namespace: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10,
+    getter: Optional[Callable] = None,
+    cache: Optional[FeedCache] = None,
+) -> Optional[List[Dict]]:
+    """
+    条件请求抓取 RSS 并返回解析后的条目
+
+    Args:
+        url: RSS 地址
+        parser: 将响应字节块序列解析为条目列表的函数，条目需可 JSON 序列化；
+                可只消费所需的字节块（流式解析），剩余内容不会被下载
+        namespace: 缓存命名空间，标识 parser 产出的条目结构及其版本；
+                   同一 URL 用不同 parser 抓取时需使用不同命名空间
+        headers: 额外请求头
+        timeout: 读取超时
+        getter: 自定义请求函数 getter(url, headers, timeout)，应以 stream=True 发起请求；
+                默认使用 http_client.get
+        cache: FeedCache 实例，默认使用全局实例
+
+    Returns:
+        条目列表；HTTP 状态异常时返回 None
+    """
+    cache = cache or get_feed_cache()
+    # 不同解析函数产出的条目结构不同，按命名空间 + URL 区分缓存
+    cache_key = f"{namespace}:{url}"
+    cached = cache.get(cache_key)
+
+    request_headers = dict(headers or {})
+    if cached:
+        if cached['etag']:
+            request_headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            request_headers['If-Modified-Since'] = cached['last_modified']
+
+    if getter:
+        response = getter(url, request_headers, timeout)
+    else:
+        response = http_client.get(url, headers=request_headers, timeout=timeout, stream=True)
+
+    try:
+        if response.status_code == 304 and cached:
+            return cached['items']
+        if response.status_code != 200:
+            return None
+        items = parser(response.iter_content(chunk_size=CHUNK_SIZE))
+    finally:
+        response.close()
+
+    cache.put(
+        cache_key,
+        url,
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified'),
+        items,
+    )
+    return items
+
@@ -0,0 +1,169 @@
+"""
+统一 feed 解析模块
+支持 RSS 2.0、Atom、RDF (RSS 1.0)。解析函数只处理调用方提供的字节，不发起网络请求；
+基于 XMLPullParser 增量解析字节流，逐条产出条目，达到所需条数后立即停止读取；
+发布时间在解析时统一转换为 UTC 时间戳。stream_feed_items 为基于 http_client 的流式抓取封装
+"""
+
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+CHUNK_SIZE = 8192
+# 条目结构的版本，作为 RSS 条件请求缓存的命名空间；条目字段变化时递增，旧缓存随之失效
+FEED_ITEMS_NAMESPACE = 'feed_items/v1'
+
+ITEM_TAGS = ('item', 'entry')
+DESCRIPTION_TAGS = ('description', 'summary', 'content')
+DATE_TAGS = ('pubDate', 'published', 'updated', 'date')
+AUTHOR_TAGS = ('author', 'creator')
+
+
+def parse_date(text: Optional[str]) -> int:
+    """
+    将 feed 日期字符串解析为 UTC 时间戳
+
+    支持 RFC 822（RSS pubDate）与 ISO 8601（Atom / dc:date），
+    未带时区的时间按 UTC 处理；无法解析时返回 0
+    """
+    if not text:
+        return 0
+    text = text.strip()
+    dt = None
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        dt = None
+    if dt is None:
+        try:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _local_name(tag: str) -> str:
+    """去掉命名空间前缀：{http://www.w3.org/2005/Atom}entry -> entry"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _text(elem: Optional[ET.Element]) -> Optional[str]:
+    if elem is None:
+        return None
+    return elem.text
+
+
+def _item_to_dict(item: ET.Element) -> Dict[str, Optional[str]]:
+    """将 RSS <item> / Atom <entry> 转为统一字段：title/link/description/pubDate/published_ts/author"""
+    children: Dict[str, List[ET.Element]] = {}
+    for child in item:
+        children.setdefault(_local_name(child.tag), []).append(child)
+
+    def first(*names):
+        for name in names:
+            if name in children:
+                return children[name][0]
+        return None
+
+    link = None
+    for link_elem in children.get('link', []):
+        if link_elem.text and link_elem.text.strip():
+            link = link_elem.text.strip()
+            break
+        # Atom: <link rel="alternate" href="..."/>
+        if link_elem.get('href') and link_elem.get('rel', 'alternate') == 'alternate':
+            link = link_elem.get('href')
+            break
+
+    author_elem = first(*AUTHOR_TAGS)
+    author = None
+    if author_elem is not None:
+        name_elem = next((c for c in author_elem if _local_name(c.tag) == 'name'), None)
+        author = _text(name_elem) if name_elem is not None else _text(author_elem)
+
+    pub_date = _text(first(*DATE_TAGS))
+    return {
+        'title': _text(first('title')),
+        'link': link,
+        'description': _text(first(*DESCRIPTION_TAGS)),
+        'pubDate': pub_date,
+        'published_ts': parse_date(pub_date),
+        'author': author,
+    }
+
+
+def iter_feed_items(chunks: Iterable[bytes], limit: Optional[int] = None) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    增量解析 RSS/Atom 字节流，逐条产出条目
+
+    Args:
+        chunks: 字节块序列（如 response.iter_content()），也可以是只含完整文档的列表
+        limit: 最多产出的条目数，达到后停止消费 chunks
+
+    Yields:
+        条目字典，字段见 _item_to_dict
+    """
+    if limit is not None and limit <= 0:
+        return
+    parser = ET.XMLPullParser(events=('end',))
+    count = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _local_name(elem.tag) not in ITEM_TAGS:
+                continue
+            yield _item_to_dict(elem)
+            elem.clear()
+            count += 1
+            if limit is not None and count >= limit:
+                return
+    # 文档结束：校验完整性并取出剩余事件
+    parser.close()
+    for _, elem in parser.read_events():
+        if _local_name(elem.tag) in ITEM_TAGS:
+            yield _item_to_dict(elem)
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def parse_feed(content: Union[bytes, Iterable[bytes]], limit: Optional[int] = None) -> List[Dict]:
+    """解析完整 feed 文档（bytes）或字节块序列，返回条目列表"""
+    if isinstance(content, (bytes, bytearray)):
+        content = [bytes(content)]
+    return list(iter_feed_items(content, limit))
+
+
+def parse_feed_items(chunks: Iterable[bytes]) -> List[Dict]:
+    """解析全部条目，可直接作为 feed_cache.fetch_feed 的 parser"""
+    return parse_feed(chunks)
+
+
+def iter_response_items(response, limit: Optional[int] = None) -> Iterator[Dict[str, Optional[str]]]:
+    """从 stream=True 的响应中增量解析条目，结束或提前停止时关闭响应"""
+    try:
+        yield from iter_feed_items(response.iter_content(chunk_size=CHUNK_SIZE), limit)
+    finally:
+        response.close()
+
+
+def stream_feed_items(url: str, *, limit: Optional[int] = None, headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> Optional[List[Dict[str, Optional[str]]]]:
+    """
+    流式抓取并解析 feed，仅读取前 limit 条所需的字节
+
+    Returns:
+        条目列表；HTTP 状态非 200 时返回 None
+    """
+    # 延迟导入：解析函数本身不依赖网络层
+    import http_client
+
+    response = http_client.get(url, headers=headers, timeout=timeout, stream=True)
+    if response.status_code != 200:
+        response.close()
+        return None
+    return list(iter_response_items(response, limit))
@@ -0,0 +1,133 @@
+"""
+HTTP 传输层
+所有抓取模块共用的 requests.Session：按主机复用 keep-alive 连接池、
+统一压缩协商（gzip/deflate，安装 brotli 时附带 br）与统一超时
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from env_config import env_float, env_int
+
+
+# 连接池与超时配置在首次使用时读取环境变量（此时 .env 已由入口脚本加载）：
+# HTTP_POOL_CONNECTIONS 为缓存的主机连接池数量，HTTP_POOL_MAXSIZE 为单个主机的最大连接数；
+# 连接超时固定，读取超时可由调用方按接口覆盖
+DEFAULT_POOL_CONNECTIONS = 32
+DEFAULT_POOL_MAXSIZE = 8
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 15.0
+
+
+def default_timeouts():
+    """(连接超时, 读取超时)，取自 HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT"""
+    return (
+        env_float('HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        env_float('HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+    )
+
+
+try:
+    import brotli  # noqa: F401  urllib3 仅在安装 brotli 时才能解码 br
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=env_int('HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS),
+        pool_maxsize=env_int('HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+
+def get_session() -> requests.Session:
+    """获取进程内共享的 Session（首次调用时创建）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _normalize_timeout(timeout):
+    """未指定时使用默认超时；单个数值视为读取超时，连接超时统一为默认连接超时"""
+    connect_timeout, read_timeout = default_timeouts()
+    if timeout is None:
+        return (connect_timeout, read_timeout)
+    if isinstance(timeout, (int, float)):
+        return (min(connect_timeout, timeout), timeout)
+    return timeout
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """通过共享 Session 发起请求，参数与 requests.request 一致"""
+    kwargs['timeout'] = _normalize_timeout(kwargs.get('timeout'))
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET 请求"""
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST 请求"""
+    return request('POST', url, **kwargs)
+
+
+def close() -> None:
+    """关闭共享 Session 并释放连接池"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+class HostRateLimiter:
+    """
+    按主机限速器：同一主机相邻两次请求的间隔不少于 min_interval 秒
+    多线程共享，用于并发抓取时替代固定 sleep
+    """
+
+    def __init__(self, min_interval: float = 0.5):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str, timeout: Optional[float] = None) -> bool:
+        """
+        阻塞直到该 URL 所在主机有可用的请求配额
+
+        Args:
+            timeout: 最长等待秒数；需要等待更久时不占用配额，立即返回 False
+
+        Returns:
+            是否取得配额
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            if timeout is not None and slot - now > timeout:
+                return False
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return True
@@ -3,12 +3,14 @@
 专门抓取联合国、北约、欧盟等国际组织的最新动态
 """
 
-import requests
-import feedparser
 import time
 from typing import List, Dict
 from datetime import datetime, timedelta
 
+from feed_cache import fetch_feed
+from feed_parser import FEED_ITEMS_NAMESPACE, parse_feed_items
+from keyword_matcher import get_matcher
+
 
 def fetch_international_organizations(max_items: int = 3) -> List[Dict]:
     """
@@ -60,39 +62,37 @@ def fetch_international_organizations(max_items: int = 3) -> List[Dict]:
             print(f"🏛️ 抓取 {source['name']}...")
             
             # 解析 RSS 源
-            feed = feedparser.parse(source['url'])
+            entries = fetch_feed(source['url'], parse_feed_items, namespace=FEED_ITEMS_NAMESPACE)
             
-            if feed.bozo:
-                print(f"⚠️ {source['name']} RSS 解析失败")
+            if entries is None:
+                print(f"⚠️ {source['name']} RSS 获取失败")
                 continue
             
             items_added = 0
-            for entry in feed.entries[:max_items * 2]:
+            for entry in entries[:max_items * 2]:
                 if items_added >= max_items:
                     break
                 
                 # 检查是否包含相关关键词
-                title = entry.get('title', '').lower()
-                summary = entry.get('summary', '').lower()
+                title = (entry['title'] or '').lower()
+                summary = (entry['description'] or '').lower()
                 content = f"{title} {summary}"
                 
                 # 关键词匹配
-                if any(keyword.lower() in content for keyword in source['keywords']):
+                if get_matcher(source['keywords']).search(content, prepared=True):
                     # 解析发布时间
-                    pub_time = datetime.now()
-                    try:
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_time = datetime(*entry.published_parsed[:6])
-                    except:
-                        pass
+                    pub_time = datetime.fromtimestamp(entry['published_ts']) if entry['published_ts'] else datetime.now()
                     
+                    excerpt = entry['description'] or ''
+                    if len(excerpt) > 200:
+                        excerpt = excerpt[:200] + '...'
                     # 检查新鲜度（48小时内，国际组织动态相对稳定）
                     if datetime.now() - pub_time <= timedelta(hours=48):
                         news_item = {
-                            'title': entry.get('title', ''),
-                            'url': entry.get('link', ''),
-                            'selftext': entry.get('summary', '')[:200] + '...' if len(entry.get('summary', '')) > 200 else entry.get('summary', ''),
-                            'summary': entry.get('summary', '')[:200] + '...' if len(entry.get('summary', '')) > 200 else entry.get('summary', ''),
+                            'title': entry['title'] or '',
+                            'url': entry['link'] or '',
+                            'selftext': excerpt,
+                            'summary': excerpt,
                             'source': source['name'],
                             'category': source['category'],
                             'published_time': pub_time,
@@ -156,6 +156,7 @@ def fetch_conflict_news(max_items: int = 3) -> List[Dict]:
         "North Korea", "DPRK", "nuclear", "missile", "sanctions",
         "Taiwan", "South China Sea", "territorial", "dispute"
     ]
+    matcher = get_matcher(conflict_keywords)
     
     all_news = []
     
@@ -163,37 +164,35 @@ def fetch_conflict_news(max_items: int = 3) -> List[Dict]:
         try:
             print(f"⚔️ 抓取 {source['name']} 冲突动态...")
             
-            feed = feedparser.parse(source['url'])
+            entries = fetch_feed(source['url'], parse_feed_items, namespace=FEED_ITEMS_NAMESPACE)
             
-            if feed.bozo:
-                print(f"⚠️ {source['name']} RSS 解析失败")
+            if entries is None:
+                print(f"⚠️ {source['name']} RSS 获取失败")
                 continue
             
             items_added = 0
-            for entry in feed.entries[:max_items * 3]:  # 多取一些用于过滤
+            for entry in entries[:max_items * 3]:  # 多取一些用于过滤
                 if items_added >= max_items:
                     break
                 
-                title = entry.get('title', '').lower()
-                summary = entry.get('summary', '').lower()
+                title = (entry['title'] or '').lower()
+                summary = (entry['description'] or '').lower()
                 content = f"{title} {summary}"
                 
                 # 冲突关键词匹配
-                if any(keyword.lower() in content for keyword in conflict_keywords):
-                    pub_time = datetime.now()
-                    try:
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_time = datetime(*entry.published_parsed[:6])
-                    except:
-                        pass
+                if matcher.search(content, prepared=True):
+                    pub_time = datetime.fromtimestamp(entry['published_ts']) if entry['published_ts'] else datetime.now()
                     
+                    excerpt = entry['description'] or ''
+                    if len(excerpt) > 200:
+                        excerpt = excerpt[:200] + '...'
                     # 检查新鲜度（24小时内，冲突动态时效性强）
                     if datetime.now() - pub_time <= timedelta(hours=24):
                         news_item = {
-                            'title': entry.get('title', ''),
-                            'url': entry.get('link', ''),
-                            'selftext': entry.get('summary', '')[:200] + '...' if len(entry.get('summary', '')) > 200 else entry.get('summary', ''),
-                            'summary': entry.get('summary', '')[:200] + '...' if len(entry.get('summary', '')) > 200 else entry.get('summary', ''),
+                            'title': entry['title'] or '',
+                            'url': entry['link'] or '',
+                            'selftext': excerpt,
+                            'summary': excerpt,
                             'source': source['name'],
                             'category': '地区冲突',
                             'published_time': pub_time,
@@ -0,0 +1,105 @@
+"""
+多关键词匹配模块
+将一组关键词编译为单个正则（按长度降序的备选分支 + 零宽前瞻），
+一次扫描文本即可得到全部命中的关键词，代替 any(k in text for k in keywords) 的逐词扫描
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    编译后的关键词集合（子串匹配语义，与 `keyword in text` 一致）
+
+    前瞻正则在每个位置报告从该位置开始的最长关键词；同一位置更短的关键词必然是其前缀，
+    因此预先计算每个关键词的"前缀闭包"，即可在单次扫描中得到所有命中（包括重叠命中）
+    """
+
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        normalized: List[str] = []
+        for k in keywords:
+            k = k if case_sensitive else k.lower()
+            if k and k not in normalized:
+                normalized.append(k)
+        self.keywords: Tuple[str, ...] = tuple(normalized)
+        self._index = {k: i for i, k in enumerate(self.keywords)}
+
+        if self.keywords:
+            alternatives = '|'.join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+            self._any = re.compile(alternatives)
+            self._all = re.compile(f'(?=({alternatives}))')
+        else:
+            self._any = self._all = None
+
+        # 前缀闭包：命中 k 时，所有作为 k 前缀的关键词也同时命中
+        self._closure = {
+            k: frozenset(self._index[p] for p in self.keywords if k.startswith(p))
+            for k in self.keywords
+        }
+
+    def _prepare(self, text: Optional[str]) -> str:
+        text = text or ''
+        return text if self.case_sensitive else text.lower()
+
+    def search(self, text: Optional[str], *, prepared: bool = False) -> bool:
+        """文本是否包含任一关键词；prepared=True 表示文本已转为小写"""
+        if self._any is None:
+            return False
+        return self._any.search(text if prepared else self._prepare(text)) is not None
+
+    def match_ids(self, text: Optional[str], *, prepared: bool = False) -> Set[int]:
+        """返回文本中命中的全部关键词序号（对应 self.keywords）"""
+        if self._all is None:
+            return set()
+        found: Set[int] = set()
+        for k in set(self._all.findall(text if prepared else self._prepare(text))):
+            found |= self._closure[k]
+        return found
+
+    def matches(self, text: Optional[str], *, prepared: bool = False) -> Set[str]:
+        """返回文本中命中的全部关键词"""
+        return {self.keywords[i] for i in self.match_ids(text, prepared=prepared)}
+
+
+class KeywordCategorizer:
+    """
+    多标签分类器
+
+    所有类别的关键词合并为一个 KeywordMatcher，一次扫描文本即可得到该文本所属的全部类别
+    （同一关键词可以属于多个类别）
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], case_sensitive: bool = False):
+        self.categories: Tuple[str, ...] = tuple(categories)
+        category_keywords = {label: list(keywords) for label, keywords in categories.items()}
+        self.matcher = KeywordMatcher(
+            [k for keywords in category_keywords.values() for k in keywords],
+            case_sensitive=case_sensitive,
+        )
+        # 关键词序号 -> 所属类别
+        self._labels: List[Set[str]] = [set() for _ in self.matcher.keywords]
+        for label, keywords in category_keywords.items():
+            for k in keywords:
+                k = self.matcher._prepare(k)
+                if k:
+                    self._labels[self.matcher._index[k]].add(label)
+
+    def categorize(self, text: Optional[str], *, prepared: bool = False) -> Set[str]:
+        """返回文本命中的全部类别；prepared=True 表示文本已转为小写"""
+        labels: Set[str] = set()
+        for i in self.matcher.match_ids(text, prepared=prepared):
+            labels |= self._labels[i]
+        return labels
+
+
+@lru_cache(maxsize=128)
+def _cached_matcher(keywords: FrozenSet[str], case_sensitive: bool) -> KeywordMatcher:
+    return KeywordMatcher(sorted(keywords), case_sensitive=case_sensitive)
+
+
+def get_matcher(keywords: Iterable[str], case_sensitive: bool = False) -> KeywordMatcher:
+    """按关键词集合获取编译后的匹配器，相同集合只编译一次"""
+    return _cached_matcher(frozenset(keywords), case_sensitive)
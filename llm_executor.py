@@ -0,0 +1,133 @@
+"""
+LLM 并发调用执行器
+在每分钟请求数（RPM）与每分钟 token 数（TPM）两个令牌桶的限制下并发调用模型，
+单次调用超时后使用回退结果，返回结果与输入顺序一致
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from env_config import env_float, env_int
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# 默认限制；GEMINI_MAX_WORKERS / GEMINI_RPM / GEMINI_TPM / GEMINI_CALL_TIMEOUT 在创建执行器时读取
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RPM = 60.0
+DEFAULT_TPM = 250000.0
+DEFAULT_CALL_TIMEOUT = 30.0
+
+
+class TokenBucket:
+    """令牌桶：每分钟补充 rate_per_minute 个令牌，容量为一分钟的额度"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = max(1.0, rate_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """取出 amount 个令牌，不足时阻塞等待；超过容量的请求按容量计"""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LLMExecutor:
+    """受 RPM/TPM 限制的并发模型调用执行器"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        """未指定的参数取自对应环境变量；GEMINI_CALL_TIMEOUT 小于等于 0 表示不限时"""
+        if max_workers is None:
+            max_workers = env_int('GEMINI_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+        if rpm is None:
+            rpm = env_float('GEMINI_RPM', DEFAULT_RPM)
+        if tpm is None:
+            tpm = env_float('GEMINI_TPM', DEFAULT_TPM)
+        if timeout is None:
+            timeout = env_float('GEMINI_CALL_TIMEOUT', DEFAULT_CALL_TIMEOUT)
+        if timeout <= 0:
+            timeout = None
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def map(
+        self,
+        fn: Callable[[T], R],
+        items: Sequence[T],
+        *,
+        estimate_tokens: Optional[Callable[[T], int]] = None,
+        fallback: Optional[Callable[[T], R]] = None,
+    ) -> List[Optional[R]]:
+        """
+        并发执行 fn(item)，返回与 items 顺序一致的结果
+
+        Args:
+            fn: 单条调用
+            items: 输入
+            estimate_tokens: 估算单条调用消耗的 token 数（用于 TPM 限制），缺省时不限制 TPM
+            fallback: 调用超时或抛出异常时使用的回退函数；缺省时该条结果为 None
+        """
+        if not items:
+            return []
+        started = [None] * len(items)
+        started_events = [threading.Event() for _ in items]
+
+        def run(index: int, item: T) -> R:
+            self.requests.acquire()
+            if estimate_tokens:
+                self.tokens.acquire(estimate_tokens(item))
+            started[index] = time.monotonic()
+            started_events[index].set()
+            return fn(item)
+
+        def fail(item: T) -> Optional[R]:
+            return fallback(item) if fallback else None
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)), thread_name_prefix='llm')
+        try:
+            futures = [executor.submit(run, i, item) for i, item in enumerate(items)]
+            results: List[Optional[R]] = []
+            for i, (future, item) in enumerate(zip(futures, items)):
+                try:
+                    if self.timeout is None:
+                        results.append(future.result())
+                        continue
+                    # 超时从调用真正开始（通过限流之后）计时
+                    while not started_events[i].wait(0.1):
+                        if future.done():
+                            break
+                    remaining = self.timeout
+                    if started[i] is not None:
+                        remaining = max(0.0, started[i] + self.timeout - time.monotonic())
+                    results.append(future.result(timeout=remaining))
+                except FuturesTimeoutError:
+                    print(f"⏰ 第 {i + 1} 条调用超过 {self.timeout} 秒，使用回退结果")
+                    results.append(fail(item))
+                except Exception as e:
+                    print(f"❌ 第 {i + 1} 条调用失败: {e}")
+                    results.append(fail(item))
+            return results
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
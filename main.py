@@ -4,18 +4,55 @@ Reddit Telegram 自动推送机器人主程序
 """
 
 import os
+import queue
 import sys
+import threading
+import time
 from datetime import datetime
 from datetime import timedelta
 import sqlite3
 from dotenv import load_dotenv
 
-from reddit_fetcher import fetch_multiple_subreddits
-from summarizer import summarize_post, format_summary_for_telegram
+from reddit_fetcher import iter_subreddits_concurrently
+from summarizer import get_summary_backend, summarize_post, summarize_extractive, format_summary_for_telegram, format_timing_stats, estimate_summary_tokens
+from llm_executor import LLMExecutor
 from social_fetcher import fetch_youtube_rss, fetch_nitter_rss
 from truth_social_fetcher import fetch_truth_social
 from truth_social_playwright import fetch_truth_social_playwright
 from telegram_sender import send_message_with_retry, format_message_for_telegram, validate_telegram_config
+from keyword_matcher import KeywordMatcher, get_matcher
+from bloom_filter import BloomFilter
+from feed_cache import get_feed_cache
+from dedup import canonicalize_url, cluster_near_duplicates, content_fingerprint, dedup_keys, near_duplicate_text
+
+
+# 标题中的突发/分析类关键词（用于放宽新鲜度要求）
+BREAKING_MATCHER = KeywordMatcher(['breaking', 'urgent', 'live', 'just in'])
+ANALYSIS_MATCHER = KeywordMatcher(['analysis', 'opinion', 'review'])
+
+# 高优先级关键词
+HIGH_PRIORITY_MATCHER = KeywordMatcher([
+    'breaking', 'urgent', 'crisis', 'emergency', 'alert',
+    'war', 'conflict', 'attack', 'bomb', 'explosion',
+    'election', 'vote', 'president', 'congress', 'senate',
+    'market crash', 'recession', 'inflation', 'fed', 'interest rate'
+])
+
+# 中优先级关键词
+MEDIUM_PRIORITY_MATCHER = KeywordMatcher([
+    'analysis', 'report', 'study', 'research', 'data',
+    'policy', 'law', 'regulation', 'trade', 'tariff',
+    'technology', 'ai', 'artificial intelligence', 'cyber'
+])
+
+SPAM_MATCHER = KeywordMatcher(['click here', 'free money', 'guaranteed', 'make money fast'])
+
+# 去重表前置布隆过滤器的持久化文件与最长使用时间（超过后重建以剔除已过期的记录）
+BLOOM_PATH = 'pushed_bloom.bin'
+BLOOM_MAX_AGE_HOURS = 24 * 7
+
+# 各来源并发抓取阶段的总时限（秒）
+FETCH_DEADLINE = 180.0
 
 
 def load_configuration():
@@ -28,6 +65,8 @@ def load_configuration():
         'gemini_api_key': os.getenv('GEMINI_API_KEY'),
         'dry_run': os.getenv('DRY_RUN', '0') == '1',
         'filter_keywords': os.getenv('FILTER_KEYWORDS', ''),
+        'dedupe_hours': int(os.getenv('DEDUPE_HOURS', '24')),
+        'dedup_bloom': os.getenv('DEDUP_BLOOM', '1') == '1',
     }
     
     # 验证必需配置
@@ -63,19 +102,35 @@ def get_target_subreddits():
 
 
 def process_posts(posts, gemini_api_key=None):
-    """处理帖子,生成摘要"""
-    processed_posts = []
-    
+    """处理帖子,生成摘要（使用 Gemini 时在 RPM/TPM 限制下并发调用，结果顺序与输入一致）"""
     for post in posts:
         print(f"处理帖子: {post['title'][:50]}...")
-        
-        # 生成摘要
-        summary = summarize_post(
+    
+    # 摘要后端只解析一次，供下面的闭包与限流判断共用
+    backend = get_summary_backend()
+    
+    def summarize(post):
+        return summarize_post(
             title=post['title'],
             text=post['selftext'],
-            api_key=gemini_api_key
+            api_key=gemini_api_key,
+            backend=backend,
         )
-        
+    
+    # 生成摘要（本地后端无需限流）
+    use_gemini = bool(gemini_api_key) and backend == 'gemini'
+    if use_gemini:
+        summaries = LLMExecutor().map(
+            summarize,
+            posts,
+            estimate_tokens=estimate_summary_tokens,
+            fallback=lambda post: summarize_extractive(post['title'], post['selftext']),
+        )
+    else:
+        summaries = [summarize(post) for post in posts]
+    
+    processed_posts = []
+    for post, summary in zip(posts, summaries):
         # 格式化摘要
         formatted_summary = format_summary_for_telegram(summary)
         
@@ -84,6 +139,8 @@ def process_posts(posts, gemini_api_key=None):
         processed_post['summary'] = formatted_summary
         processed_posts.append(processed_post)
     
+    if use_gemini:
+        print(f"⏱️ Gemini 耗时: {format_timing_stats()}")
     return processed_posts
 
 
@@ -98,7 +155,7 @@ def get_beijing_timestamp():
 
 
 def ensure_cache_table(conn):
-    """确保去重缓存表存在"""
+    """确保去重缓存表存在：pushed_posts 按原始 URL，dedup_index 按规范化 URL 与标题指纹"""
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS pushed_posts (
@@ -107,6 +164,14 @@ def ensure_cache_table(conn):
         )
         """
     )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dedup_index (
+            dedup_key TEXT PRIMARY KEY,
+            pushed_at_utc INTEGER
+        )
+        """
+    )
     conn.commit()
 
 
@@ -141,11 +206,11 @@ def filter_fresh_posts(posts, freshness_hours: int = 6):
             
             # 根据内容类型调整新鲜度要求
             title = post.get('title', '').lower()
-            if any(keyword in title for keyword in ['breaking', 'urgent', 'live', 'just in']):
+            if BREAKING_MATCHER.search(title, prepared=True):
                 # 突发新闻放宽到12小时
                 if hours_old <= 12:
                     fresh_posts.append(post)
-            elif any(keyword in title for keyword in ['analysis', 'opinion', 'review']):
+            elif ANALYSIS_MATCHER.search(title, prepared=True):
                 # 分析类文章放宽到48小时
                 if hours_old <= 48:
                     fresh_posts.append(post)
@@ -160,25 +225,28 @@ def filter_fresh_posts(posts, freshness_hours: int = 6):
     return fresh_posts
 
 
+def is_social_post(post) -> bool:
+    """是否为关键词过滤作用的社交源帖子（Truth Social / X）"""
+    src = (post.get('subreddit') or '').lower()
+    return src in ('truth-social', 'trump-x')
+
+
 def filter_by_keywords(posts, keyword_csv: str):
     """按关键词过滤，仅对 Truth Social/Nitter 应用；为空不筛选。若筛空则自动放宽为“仅标题匹配”。"""
     kw = [k.strip().lower() for k in keyword_csv.split(',') if k.strip()]
     if not kw:
         return posts
-
-    def is_social(p):
-        src = (p.get('subreddit') or '').lower()
-        return src in ('truth-social', 'trump-x')
+    matcher = get_matcher(kw)
 
     social, others = [], []
     for p in posts:
-        (social if is_social(p) else others).append(p)
+        (social if is_social_post(p) else others).append(p)
 
     # 严格：标题+正文
     strict = []
     for p in social:
         text = (p.get('title','') + "\n" + p.get('selftext','')).lower()
-        if any(k in text for k in kw):
+        if matcher.search(text, prepared=True):
             strict.append(p)
 
     if strict:
@@ -188,33 +256,132 @@ def filter_by_keywords(posts, keyword_csv: str):
     relaxed = []
     for p in social:
         title = p.get('title','').lower()
-        if any(k in title for k in kw):
+        if matcher.search(title, prepared=True):
             relaxed.append(p)
 
     return (relaxed if relaxed else social) + others
 
 
-def filter_dedup(conn, posts, dedupe_hours: int = 24):
-    """基于 SQLite 的去重，默认 24 小时内相同 URL 不重复推送"""
+def _find_existing(conn, table, column, values):
+    """批量查询 table.column 中已存在的值：候选值写入临时表后连接查询，一次返回命中集合"""
+    candidates = {v for v in values if v}
+    if not candidates:
+        return set()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS dedup_candidates (value TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM dedup_candidates")
+    conn.executemany("INSERT OR IGNORE INTO dedup_candidates(value) VALUES(?)", ((v,) for v in candidates))
+    rows = conn.execute(
+        f"SELECT c.value FROM dedup_candidates c JOIN {table} t ON t.{column} = c.value"
+    ).fetchall()
+    conn.execute("DELETE FROM dedup_candidates")
+    conn.commit()
+    return {row[0] for row in rows}
+
+
+def find_pushed_urls(conn, urls):
+    """批量查询已推送的原始 URL"""
+    return _find_existing(conn, 'pushed_posts', 'url', urls)
+
+
+def find_pushed_keys(conn, keys):
+    """批量查询已推送的去重键（规范化 URL / 标题指纹）"""
+    return _find_existing(conn, 'dedup_index', 'dedup_key', keys)
+
+
+def _dedup_table_state(conn):
+    """去重表的 (总行数, 最近写入时间)"""
+    row = conn.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM pushed_posts) + (SELECT COUNT(*) FROM dedup_index),
+            MAX(COALESCE((SELECT MAX(pushed_at_utc) FROM pushed_posts), 0),
+                COALESCE((SELECT MAX(pushed_at_utc) FROM dedup_index), 0))
+        """
+    ).fetchone()
+    return row[0], row[1]
+
+
+def rebuild_pushed_bloom(conn, path: str = BLOOM_PATH):
+    """由去重表重建布隆过滤器并保存：原始 URL 以 'raw:' 前缀存入，去重键原样存入"""
+    rows, max_ts = _dedup_table_state(conn)
+    bloom = BloomFilter(max(10000, rows * 2))
+    bloom.update(f"raw:{url}" for (url,) in conn.execute("SELECT url FROM pushed_posts"))
+    bloom.update(key for (key,) in conn.execute("SELECT dedup_key FROM dedup_index"))
+    bloom.meta = {'built_at': int(datetime.utcnow().timestamp()), 'max_pushed_at': max_ts}
+    bloom.save(path)
+    return bloom
+
+
+def load_pushed_bloom(conn, path: str = BLOOM_PATH, max_age_hours: int = BLOOM_MAX_AGE_HOURS):
+    """
+    加载去重布隆过滤器，过期时从去重表重建
+
+    过期条件：文件不存在或损坏、去重表有过滤器之后的写入、条目数超过容量、构建时间超过 max_age_hours
+    """
+    bloom = BloomFilter.load(path)
+    rows, max_ts = _dedup_table_state(conn)
     now_ts = int(datetime.utcnow().timestamp())
-    cutoff = now_ts - dedupe_hours * 3600
+    stale = (
+        bloom is None
+        or max_ts > bloom.meta.get('max_pushed_at', 0)
+        or max(rows, bloom.count) > bloom.capacity
+        or now_ts - bloom.meta.get('built_at', 0) > max_age_hours * 3600
+    )
+    if stale:
+        bloom = rebuild_pushed_bloom(conn, path)
+        print(f"🌸 重建去重布隆过滤器: {rows} 条记录")
+    return bloom
+
 
-    # 清理过期记录
+def purge_expired_pushed(conn, dedupe_hours: int = 24):
+    """删除去重窗口之外的已推送记录"""
+    cutoff = int(datetime.utcnow().timestamp()) - dedupe_hours * 3600
     conn.execute("DELETE FROM pushed_posts WHERE pushed_at_utc < ?", (cutoff,))
+    conn.execute("DELETE FROM dedup_index WHERE pushed_at_utc < ?", (cutoff,))
     conn.commit()
 
+
+def _dedup_batch(conn, posts, seen, bloom=None):
+    """过滤一批帖子：命中已推送记录或 seen 中去重键的丢弃，保留的帖子的去重键加入 seen"""
+    posts = [p for p in posts if p.get('url')]
+    keys_by_post = [dedup_keys(p) for p in posts]
+    urls = [p['url'] for p in posts]
+    keys = [k for post_keys in keys_by_post for k in post_keys]
+    if bloom is not None:
+        urls = [u for u in urls if f"raw:{u}" in bloom]
+        keys = [k for k in keys if k in bloom]
+    pushed_urls = find_pushed_urls(conn, urls)
+    pushed_keys = find_pushed_keys(conn, keys)
+
     results = []
-    for p in posts:
-        url = p.get('url')
-        if not url:
-            continue
-        cur = conn.execute("SELECT 1 FROM pushed_posts WHERE url = ?", (url,))
-        if cur.fetchone():
+    for p, post_keys in zip(posts, keys_by_post):
+        if p['url'] in pushed_urls or any(k in seen or k in pushed_keys for k in post_keys):
             continue
+        seen.update(post_keys)
         results.append(p)
     return results
 
 
+def filter_dedup(conn, posts, dedupe_hours: int = 24, bloom=None):
+    """
+    基于 SQLite 的去重，默认 24 小时内不重复推送
+
+    原始 URL、规范化 URL 或标题指纹任一命中已推送记录即视为重复；
+    本批次内去重键相同的帖子只保留第一条。
+    提供 bloom 时只有过滤器判定"可能存在"的键才查询数据库
+    """
+    purge_expired_pushed(conn, dedupe_hours)
+    return _dedup_batch(conn, posts, set(), bloom=bloom)
+
+
+def dedup_stage(conn, batches, dedupe_hours: int = 24, bloom=None):
+    """流式去重：过期记录只清理一次，去重键在各批次之间共享（先到达的帖子优先保留）"""
+    purge_expired_pushed(conn, dedupe_hours)
+    seen = set()
+    for batch in batches:
+        yield _dedup_batch(conn, batch, seen, bloom=bloom)
+
+
 def calculate_content_score(post):
     """智能计算内容质量评分"""
     score = 0
@@ -245,32 +412,13 @@ def calculate_content_score(post):
     content = post.get('selftext', '').lower()
     text = f"{title} {content}"
     
-    # 高优先级关键词
-    high_priority_keywords = [
-        'breaking', 'urgent', 'crisis', 'emergency', 'alert',
-        'war', 'conflict', 'attack', 'bomb', 'explosion',
-        'election', 'vote', 'president', 'congress', 'senate',
-        'market crash', 'recession', 'inflation', 'fed', 'interest rate'
-    ]
-    
-    # 中优先级关键词
-    medium_priority_keywords = [
-        'analysis', 'report', 'study', 'research', 'data',
-        'policy', 'law', 'regulation', 'trade', 'tariff',
-        'technology', 'ai', 'artificial intelligence', 'cyber'
-    ]
-    
     # 检查高优先级关键词
-    for keyword in high_priority_keywords:
-        if keyword in text:
-            score += 4
-            break
+    if HIGH_PRIORITY_MATCHER.search(text, prepared=True):
+        score += 4
     
     # 检查中优先级关键词
-    for keyword in medium_priority_keywords:
-        if keyword in text:
-            score += 2
-            break
+    if MEDIUM_PRIORITY_MATCHER.search(text, prepared=True):
+        score += 2
     
     # 内容质量评分
     content_length = len(post.get('selftext', ''))
@@ -310,8 +458,50 @@ def score_and_sort_posts(posts):
         post['quality_score'] = score
         scored_posts.append(post)
     
-    # 按质量评分排序，评分相同时按时间排序
-    return sorted(scored_posts, key=lambda x: (x['quality_score'], x.get('created_utc', 0)), reverse=True)
+    return sort_by_quality(scored_posts)
+
+
+def sort_by_quality(posts):
+    """按质量评分排序，评分相同时按时间排序"""
+    return sorted(posts, key=lambda x: (x['quality_score'], x.get('created_utc', 0)), reverse=True)
+
+
+def fresh_stage(batches, freshness_hours: int = 6):
+    """流式新鲜度过滤"""
+    for batch in batches:
+        yield filter_fresh_posts(batch, freshness_hours=freshness_hours)
+
+
+def keyword_stage(batches, keyword_csv: str):
+    """
+    流式关键词过滤：非社交源帖子直接通过；社交源帖子（数量很少）缓存到流结束，
+    再统一按 filter_by_keywords 的严格/放宽规则筛选一次
+    """
+    social = []
+    for batch in batches:
+        others = []
+        for post in batch:
+            (social if is_social_post(post) else others).append(post)
+        if others:
+            yield others
+    if social:
+        yield filter_by_keywords(social, keyword_csv)
+
+
+def score_stage(batches):
+    """流式评分：为每个帖子写入 quality_score"""
+    for batch in batches:
+        for post in batch:
+            post['quality_score'] = calculate_content_score(post)
+        yield batch
+
+
+def count_stage(batches, counts, name: str):
+    """透传批次并累计经过该阶段的帖子数"""
+    counts.setdefault(name, 0)
+    for batch in batches:
+        counts[name] += len(batch)
+        yield batch
 
 
 def smart_content_filter(posts):
@@ -329,13 +519,14 @@ def smart_content_filter(posts):
         if quality_score < 3:  # 质量分数太低
             continue
         
-        # 标题去重
+        # 标题去重（按内容指纹，忽略大小写与标点）
         title = post.get('title', '').lower().strip()
-        if not title or title in seen_titles:
+        fingerprint = content_fingerprint(title) or title
+        if not title or fingerprint in seen_titles:
             continue
         
-        # URL去重
-        url = post.get('url', '')
+        # URL去重（按规范化 URL）
+        url = canonicalize_url(post.get('url', ''))
         if url in seen_urls:
             continue
         
@@ -349,33 +540,185 @@ def smart_content_filter(posts):
             continue
         
         # 避免明显的垃圾内容
-        spam_keywords = ['click here', 'free money', 'guaranteed', 'make money fast']
-        if any(keyword in title for keyword in spam_keywords):
+        if SPAM_MATCHER.search(title, prepared=True):
             continue
         
         # 通过所有检查
         filtered_posts.append(post)
-        seen_titles.add(title)
+        seen_titles.add(fingerprint)
         seen_urls.add(url)
     
     return filtered_posts
 
 
-def mark_pushed(conn, posts):
-    """将已推送的帖子写入去重表"""
+def mark_pushed(conn, posts, bloom=None, bloom_path: str = BLOOM_PATH):
+    """将已推送的帖子（及其近似重复簇成员）写入去重表（单个事务批量写入原始 URL 与去重键），并同步布隆过滤器"""
     now_ts = int(datetime.utcnow().timestamp())
-    for p in posts:
-        url = p.get('url')
-        if not url:
-            continue
+    posts = [p for p in posts if p.get('url')]
+    posts += [m for p in posts for m in p.get('cluster_members', []) if m.get('url')]
+    if not posts:
+        return
+    keys = [k for p in posts for k in dedup_keys(p)]
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO pushed_posts(url, pushed_at_utc) VALUES(?, ?)",
+            [(p['url'], now_ts) for p in posts],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO dedup_index(dedup_key, pushed_at_utc) VALUES(?, ?)",
+            [(k, now_ts) for k in keys],
+        )
+    if bloom is not None:
+        bloom.update(f"raw:{p['url']}" for p in posts)
+        bloom.update(keys)
+        bloom.meta['max_pushed_at'] = now_ts
+        bloom.save(bloom_path)
+
+
+def tag_us_china(posts):
+    """
+    标记中美关系相关帖子（category 设为中美关系，subreddit 加 us-china- 前缀）；
+    有帖子命中时，未命中关键词但自带中美关系分类的条目被移除，避免重复
+    """
+    try:
+        from us_china_news_fetcher import filter_us_china_posts
+        tagged = filter_us_china_posts(posts)
+    except Exception as e:
+        print(f"⚠️ 中美关系标记失败: {e}")
+        return posts
+    if not tagged:
+        return posts
+    print(f"✅ 中美关系帖子: {len(tagged)} 条")
+    tagged_ids = {id(p) for p in tagged}
+    return [p for p in posts if id(p) in tagged_ids or p.get('category') != '中美关系']
+
+
+def fetch_reddit_batches(subreddits):
+    """Reddit：各板块按完成先后逐批产出"""
+    print("\n📡 开始抓取 Reddit 帖子...")
+    for _, posts in iter_subreddits_concurrently(subreddits, posts_per_subreddit=5, sort='new', time_period='day'):
+        yield tag_us_china(posts)
+
+
+def fetch_youtube_posts():
+    """YouTube 频道 RSS"""
+    print("\n📺 抓取 YouTube 频道...")
+    yt_channel = os.getenv('TRUMP_YT_CHANNEL_ID', '').strip()
+    if not yt_channel:
+        # 默认使用特朗普官方频道 ID，免配置可用
+        yt_channel = 'UCp0hYYBW6IMayGgR-WeoCvQ'
+        print("ℹ️ 未配置 TRUMP_YT_CHANNEL_ID，已使用默认频道ID")
+    yt_posts = fetch_youtube_rss(channel_id=yt_channel, limit=5)
+    if yt_posts:
+        print(f"✅ YouTube: {len(yt_posts)} 条")
+    else:
+        print("⚠️ YouTube 未获取内容")
+    return tag_us_china(yt_posts or [])
+
+
+def fetch_nitter_posts():
+    """Nitter (X 镜像)"""
+    print("\n🐦 抓取 Nitter (X 镜像)...")
+    x_username = os.getenv('TRUMP_X_USERNAME', 'realDonaldTrump').strip()
+    x_posts = fetch_nitter_rss(username=x_username, limit=5)
+    if x_posts:
+        print(f"✅ Nitter: {len(x_posts)} 条")
+    else:
+        print("⚠️ Nitter 未获取内容 (可能限流/网络问题)")
+    return tag_us_china(x_posts or [])
+
+
+def fetch_us_china_posts():
+    """中美关系新闻源"""
+    print("\n🇺🇸🇨🇳 抓取中美关系新闻...")
+    from us_china_news_fetcher import fetch_us_china_news
+    us_china_news = fetch_us_china_news(max_items=3)
+    if us_china_news:
+        print(f"✅ 中美关系新闻: {len(us_china_news)} 条")
+    return tag_us_china(us_china_news or [])
+
+
+def fetch_intl_org_posts():
+    """国际组织动态"""
+    print("\n🌍 抓取国际组织动态...")
+    from international_relations_fetcher import fetch_international_organizations
+    intl_org_news = fetch_international_organizations(max_items=2)
+    if intl_org_news:
+        print(f"✅ 国际组织动态: {len(intl_org_news)} 条")
+    return intl_org_news or []
+
+
+def fetch_conflict_posts():
+    """地区冲突动态"""
+    print("\n🌍 抓取地区冲突动态...")
+    from international_relations_fetcher import fetch_conflict_news
+    conflict_news = fetch_conflict_news(max_items=2)
+    if conflict_news:
+        print(f"✅ 地区冲突动态: {len(conflict_news)} 条")
+    return conflict_news or []
+
+
+def fetch_truth_social_posts():
+    """Truth Social（优先第三方数据集；无配置则使用 Playwright 抓取）"""
+    print("\n📰 抓取 Truth Social...")
+    ts_dataset = os.getenv('TRUTH_SOCIAL_DATASET_URL', '').strip()
+    ts_token = os.getenv('APIFY_TOKEN', '').strip() or None
+    if ts_dataset:
+        ts_posts = fetch_truth_social(ts_dataset, limit=10, token=ts_token)
+        if ts_posts:
+            print(f"✅ Truth Social: {len(ts_posts)} 条")
+        else:
+            print("⚠️ Truth Social 未获取内容")
+        return ts_posts or []
+    print("ℹ️ 未配置数据集，尝试本地无头抓取（Playwright）...")
+    ts_pw_posts = fetch_truth_social_playwright(username='realDonaldTrump', limit=10)
+    if ts_pw_posts:
+        print(f"✅ Truth Social(Playwright): {len(ts_pw_posts)} 条")
+    else:
+        print("⚠️ Truth Social(Playwright) 未获取内容（已回退缓存策略）")
+    return ts_pw_posts or []
+
+
+def iter_source_batches(sources, deadline: float = FETCH_DEADLINE):
+    """
+    并发运行各抓取源，按到达先后逐批产出帖子
+
+    Args:
+        sources: (来源名称, 抓取函数) 列表；抓取函数返回帖子列表，或逐批产出帖子列表的生成器
+        deadline: 整个抓取阶段的总时限（秒），超时后放弃未完成的来源
+
+    Yields:
+        帖子列表（单个来源的一批）
+    """
+    results = queue.Queue()
+
+    def run(name, fetch):
         try:
-            conn.execute(
-                "INSERT OR REPLACE INTO pushed_posts(url, pushed_at_utc) VALUES(?, ?)",
-                (url, now_ts),
-            )
-        except Exception:
-            pass
-    conn.commit()
+            batches = fetch()
+            for batch in [batches] if isinstance(batches, list) else batches:
+                results.put((name, batch))
+        except Exception as e:
+            print(f"⚠️ {name} 抓取异常，继续处理其他来源: {e}")
+        finally:
+            results.put((name, None))
+
+    for name, fetch in sources:
+        threading.Thread(target=run, args=(name, fetch), name=f"fetch-{name}", daemon=True).start()
+
+    end = time.monotonic() + deadline
+    pending = [name for name, _ in sources]
+    while pending:
+        try:
+            name, batch = results.get(timeout=max(0.0, end - time.monotonic()))
+        except queue.Empty:
+            # 抓取线程为守护线程，放弃后不阻塞退出；但来源内部的线程池（如 Reddit 板块并发）
+            # 使用非守护线程，进程退出前仍需等待其请求按各自的超时结束
+            print(f"⏰ 抓取超过总时限 {deadline:.0f} 秒，放弃: {', '.join(pending)}")
+            return
+        if batch is None:
+            pending.remove(name)
+        elif batch:
+            yield batch
 
 
 def main():
@@ -401,131 +744,62 @@ def main():
         subreddits = get_target_subreddits()
         print(f"🎯 目标板块: {', '.join(subreddits)}")
         
-        # 4. 抓取 Reddit 帖子（若受限可暂时跳过，仅抓取社交源）
-        posts = []
-        try:
-            print("\n📡 开始抓取 Reddit 帖子...")
-            reddit_posts = fetch_multiple_subreddits(
-                subreddits,
-                posts_per_subreddit=5,
-                sort='new',
-                time_period='day',
-            )
-            posts.extend(reddit_posts)
-        except Exception:
-            print("⚠️ Reddit 抓取异常，继续处理其他来源")
-
-        # 4.1 抓取社交平台 (YouTube RSS 与 Nitter 备选)
-        print("\n📺 抓取 YouTube 频道...")
-        yt_channel = os.getenv('TRUMP_YT_CHANNEL_ID', '').strip()
-        if not yt_channel:
-            # 默认使用特朗普官方频道 ID，免配置可用
-            yt_channel = 'UCp0hYYBW6IMayGgR-WeoCvQ'
-            print("ℹ️ 未配置 TRUMP_YT_CHANNEL_ID，已使用默认频道ID")
-        yt_posts = fetch_youtube_rss(channel_id=yt_channel, limit=5)
-        if yt_posts:
-            print(f"✅ YouTube: {len(yt_posts)} 条")
-            posts.extend(yt_posts)
-        else:
-            print("⚠️ YouTube 未获取内容")
-
-        print("\n🐦 抓取 Nitter (X 镜像)...")
-        x_username = os.getenv('TRUMP_X_USERNAME', 'realDonaldTrump').strip()
-        x_posts = fetch_nitter_rss(username=x_username, limit=5)
-        if x_posts:
-            print(f"✅ Nitter: {len(x_posts)} 条")
-            posts.extend(x_posts)
-        else:
-            print("⚠️ Nitter 未获取内容 (可能限流/网络问题)")
-
-        # 4.2 抓取中美关系新闻
-        print("\n🇺🇸🇨🇳 抓取中美关系新闻...")
-        try:
-            from us_china_news_fetcher import fetch_us_china_news, filter_us_china_posts
-            
-            # 抓取专门的新闻源
-            us_china_news = fetch_us_china_news(max_items=3)
-            if us_china_news:
-                print(f"✅ 中美关系新闻: {len(us_china_news)} 条")
-                posts.extend(us_china_news)
-            
-            # 从 Reddit 帖子中过滤中美关系相关内容
-            us_china_reddit = filter_us_china_posts(posts)
-            if us_china_reddit:
-                print(f"✅ Reddit 中美关系帖子: {len(us_china_reddit)} 条")
-                # 移除原帖子中的中美关系内容，避免重复
-                posts = [p for p in posts if not p.get('category') == '中美关系']
-                posts.extend(us_china_reddit)
-                
-        except Exception as e:
-            print(f"⚠️ 中美关系新闻抓取失败: {e}")
-
-        # 4.3 抓取国际关系动态
-        print("\n🌍 抓取国际关系动态...")
-        try:
-            from international_relations_fetcher import fetch_international_organizations, fetch_conflict_news
-            
-            # 抓取国际组织动态
-            intl_org_news = fetch_international_organizations(max_items=2)
-            if intl_org_news:
-                print(f"✅ 国际组织动态: {len(intl_org_news)} 条")
-                posts.extend(intl_org_news)
-            
-            # 抓取地区冲突动态
-            conflict_news = fetch_conflict_news(max_items=2)
-            if conflict_news:
-                print(f"✅ 地区冲突动态: {len(conflict_news)} 条")
-                posts.extend(conflict_news)
-                
-        except Exception as e:
-            print(f"⚠️ 国际关系动态抓取失败: {e}")
-
-        # 4.4 Truth Social（优先第三方数据集；无配置则使用 Playwright 抓取）
-        print("\n📰 抓取 Truth Social...")
-        ts_dataset = os.getenv('TRUTH_SOCIAL_DATASET_URL', '').strip()
-        ts_token = os.getenv('APIFY_TOKEN', '').strip() or None
-        if ts_dataset:
-            ts_posts = fetch_truth_social(ts_dataset, limit=10, token=ts_token)
-            if ts_posts:
-                print(f"✅ Truth Social: {len(ts_posts)} 条")
-                posts.extend(ts_posts)
-            else:
-                print("⚠️ Truth Social 未获取内容")
-        else:
-            print("ℹ️ 未配置数据集，尝试本地无头抓取（Playwright）...")
-            ts_pw_posts = fetch_truth_social_playwright(username='realDonaldTrump', limit=10)
-            if ts_pw_posts:
-                print(f"✅ Truth Social(Playwright): {len(ts_pw_posts)} 条")
-                posts.extend(ts_pw_posts)
-            else:
-                print("⚠️ Truth Social(Playwright) 未获取内容（已回退缓存策略）")
-        
-        # 4.3 智能新鲜度过滤
-        fresh_posts = filter_fresh_posts(posts, freshness_hours=6)
-        print(f"🕒 智能新鲜度过滤后: {len(fresh_posts)} 个帖子")
-
-        # 4.4 关键词过滤（可选）
-        filtered_posts = filter_by_keywords(fresh_posts, config.get('filter_keywords',''))
+        # 4. 各来源并发抓取，每批到达后立即流式经过新鲜度、关键词、去重与评分阶段；
+        #    只有最终排序选取需要完整集合
+        sources = [
+            ('Reddit', lambda: fetch_reddit_batches(subreddits)),
+            ('YouTube', fetch_youtube_posts),
+            ('Nitter', fetch_nitter_posts),
+            ('中美关系新闻', fetch_us_china_posts),
+            ('国际组织动态', fetch_intl_org_posts),
+            ('地区冲突动态', fetch_conflict_posts),
+            ('Truth Social', fetch_truth_social_posts),
+        ]
+        counts = {}
+        batches = count_stage(iter_source_batches(sources), counts, 'fetched')
+
+        # 4.1 智能新鲜度过滤
+        batches = count_stage(fresh_stage(batches, freshness_hours=6), counts, 'fresh')
+
+        # 4.2 关键词过滤（可选）
         if config.get('filter_keywords'):
-            print(f"🔎 关键词过滤后: {len(filtered_posts)} 个（关键词: {config.get('filter_keywords')}）")
-        else:
-            filtered_posts = fresh_posts
+            batches = count_stage(keyword_stage(batches, config['filter_keywords']), counts, 'keywords')
 
-        # 4.5 基于 SQLite 的去重（24 小时）；DRY_RUN 下跳过去重，便于本地预览
+        # 4.3 基于 SQLite 的去重（默认 24 小时，DEDUPE_HOURS 可调）；DRY_RUN 下跳过去重，便于本地预览
         conn = sqlite3.connect('news_cache.db')
         ensure_cache_table(conn)
-        if config['dry_run']:
-            posts = filtered_posts
-            print(f"♻️ DRY_RUN 跳过去重: {len(posts)} 个帖子")
+        bloom = None
+        if not config['dry_run']:
+            if config['dedup_bloom']:
+                bloom = load_pushed_bloom(conn)
+            batches = count_stage(dedup_stage(conn, batches, dedupe_hours=config['dedupe_hours'], bloom=bloom), counts, 'unique')
+            # RSS 条件请求缓存中长期未更新的源随已推送记录一起清理
+            get_feed_cache().cleanup()
+
+        # 4.4 智能内容质量评分
+        posts = [post for batch in score_stage(batches) for post in batch]
+
+        print(f"\n📥 抓取完成: {counts['fetched']} 个帖子")
+        print(f"🕒 智能新鲜度过滤后: {counts['fresh']} 个帖子")
+        if 'keywords' in counts:
+            print(f"🔎 关键词过滤后: {counts['keywords']} 个（关键词: {config.get('filter_keywords')}）")
+        if 'unique' in counts:
+            print(f"♻️ 去重后: {counts['unique']} 个帖子")
         else:
-            unique_posts = filter_dedup(conn, filtered_posts, dedupe_hours=24)
-            print(f"♻️ 去重后: {len(unique_posts)} 个帖子")
-            posts = unique_posts
+            print(f"♻️ DRY_RUN 跳过去重: {len(posts)} 个帖子")
 
-        # 4.6 智能内容质量评分和排序
-        posts = score_and_sort_posts(posts)
+        # 4.5 按评分排序（需要完整集合）
+        posts = sort_by_quality(posts)
         print(f"📊 智能内容质量评分完成，最高分: {posts[0]['quality_score'] if posts else 0}")
         
+        # 4.6.1 近似重复聚类：同一报道的多个来源只保留评分最高的一条
+        posts = cluster_near_duplicates(
+            posts,
+            text_of=lambda p: near_duplicate_text(p, 'selftext'),
+            weight_of=lambda p: p.get('quality_score', 0),
+        )
+        print(f"🧩 近似重复聚类后: {len(posts)} 个帖子")
+        
         # 4.7 智能去重和内容质量过滤
         posts = smart_content_filter(posts)
         print(f"🧠 智能内容过滤后: {len(posts)} 个帖子")
@@ -589,7 +863,7 @@ def main():
             if success:
                 # 7.1 标记已推送用于后续去重
                 try:
-                    mark_pushed(conn, processed_posts)
+                    mark_pushed(conn, processed_posts, bloom=bloom)
                 except Exception:
                     pass
                 print("🎉 任务完成! 消息已成功发送到 Telegram")
@@ -6,16 +6,24 @@
 import os
 import sys
 import requests
-import xml.etree.ElementTree as ET
+import http_client
+from feed_cache import fetch_feed, get_feed_cache
+from mirror_selector import MirrorSelector, hedged_fetch
+from feed_parser import iter_feed_items, iter_response_items
+from keyword_matcher import KeywordCategorizer, KeywordMatcher
+from dedup import cluster_near_duplicates, near_duplicate_text
+from summary_cache import get_summary_cache
+from llm_executor import LLMExecutor
+from summarizer import format_timing_stats, generate_content, generate_json_batch, get_gemini_model
+import threading
 import time
-import random
 import json
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 load_dotenv()
 
@@ -25,13 +33,47 @@ def log(message):
     print(f"[{timestamp}] {message}")
 
 class SourceHealthMonitor:
-    """源健康监控器"""
-    def __init__(self, db_path="sources_health.db"):
+    """
+    源健康监控器（熔断器）
+    启动时将 source_health 表整体载入内存，查询与记录只操作内存；
+    变化的行在 save() 时（或距上次写回超过 flush_interval 秒时）一次性写回数据库
+
+    熔断状态：
+      closed    正常请求；连续失败（含超过 slow_call_seconds 的慢请求）达到 failure_threshold 次后熔断
+      open      在 open_until 之前跳过该源；每次连续熔断的时长翻倍，最长 max_open_seconds
+      half_open 熔断期结束后放行一次探测请求：成功则恢复 closed，失败则立即再次熔断
+    """
+
+    COLUMNS = ('last_success', 'last_failure', 'failure_count', 'is_healthy', 'weight', 'open_until', 'open_count', 'latency')
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        db_path="sources_health.db",
+        flush_interval: float = 60.0,
+        failure_threshold: int = 3,
+        base_open_seconds: float = 6 * 3600,
+        max_open_seconds: float = 7 * 86400,
+        slow_call_seconds: float = 20.0,
+    ):
         self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = base_open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._dirty = set()
+        self._last_flush = time.monotonic()
         self.init_db()
+        self.load()
     
     def init_db(self):
-        """初始化数据库"""
+        """初始化数据库（旧表自动补齐熔断相关列）"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('''
@@ -41,115 +83,241 @@ class SourceHealthMonitor:
                 last_failure TIMESTAMP,
                 failure_count INTEGER DEFAULT 0,
                 is_healthy INTEGER DEFAULT 1,
-                weight REAL DEFAULT 1.0
+                weight REAL DEFAULT 1.0,
+                open_until REAL,
+                open_count INTEGER DEFAULT 0,
+                latency REAL
             )
         ''')
+        existing = {row[1] for row in cursor.execute('PRAGMA table_info(source_health)')}
+        for column, ddl in (('open_until', 'REAL'), ('open_count', 'INTEGER DEFAULT 0'), ('latency', 'REAL')):
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE source_health ADD COLUMN {column} {ddl}')
         conn.commit()
         conn.close()
     
-    def record_success(self, source_name: str, weight: float = 1.0):
-        """记录成功"""
+    def load(self):
+        """从数据库加载全部源的健康状态"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO source_health 
-            (source_name, last_success, failure_count, is_healthy, weight)
-            VALUES (?, ?, 0, 1, ?)
-        ''', (source_name, datetime.now(), weight))
-        conn.commit()
+        rows = conn.execute(f"SELECT source_name, {', '.join(self.COLUMNS)} FROM source_health").fetchall()
         conn.close()
+        with self._lock:
+            for name, *values in rows:
+                self._rows[name] = dict(zip(self.COLUMNS, values))
+    
+    def _row(self, source_name: str) -> Dict[str, Any]:
+        return self._rows.setdefault(source_name, {
+            'last_success': None,
+            'last_failure': None,
+            'failure_count': 0,
+            'is_healthy': 1,
+            'weight': 1.0,
+            'open_until': None,
+            'open_count': 0,
+            'latency': None,
+        })
+    
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.save()
+    
+    def _trip(self, row: Dict[str, Any]):
+        """熔断：熔断时长随连续熔断次数指数增长"""
+        row['open_count'] = (row['open_count'] or 0) + 1
+        open_seconds = min(self.base_open_seconds * 2 ** (row['open_count'] - 1), self.max_open_seconds)
+        row['open_until'] = time.time() + open_seconds
+        row['is_healthy'] = 0
+    
+    def _on_failure(self, row: Dict[str, Any]):
+        was_closed = self._state(row) == self.CLOSED
+        row['failure_count'] = (row['failure_count'] or 0) + 1
+        if not was_closed or row['failure_count'] >= self.failure_threshold:
+            self._trip(row)
+    
+    def _state(self, row: Optional[Dict[str, Any]]) -> str:
+        if not row or row['is_healthy']:
+            return self.CLOSED
+        if row['open_until'] and time.time() < row['open_until']:
+            return self.OPEN
+        return self.HALF_OPEN
+    
+    def state(self, source_name: str) -> str:
+        """熔断状态：closed / open / half_open"""
+        return self._state(self._rows.get(source_name))
+    
+    def record_success(self, source_name: str, weight: float = 1.0, latency: Optional[float] = None):
+        """记录成功；耗时超过 slow_call_seconds 的请求按失败计入熔断"""
+        with self._lock:
+            row = self._row(source_name)
+            row.update(last_success=datetime.now(), weight=weight)
+            if latency is not None:
+                row['latency'] = latency
+            if latency is not None and latency >= self.slow_call_seconds:
+                self._on_failure(row)
+            else:
+                row.update(failure_count=0, is_healthy=1, open_until=None, open_count=0)
+            self._dirty.add(source_name)
+        self._maybe_flush()
     
     def record_failure(self, source_name: str):
         """记录失败"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO source_health 
-            (source_name, last_failure, failure_count, is_healthy)
-            VALUES (?, ?, COALESCE((SELECT failure_count FROM source_health WHERE source_name = ?), 0) + 1, 0)
-        ''', (source_name, datetime.now(), source_name))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            row = self._row(source_name)
+            row['last_failure'] = datetime.now()
+            self._on_failure(row)
+            self._dirty.add(source_name)
+        self._maybe_flush()
     
     def is_healthy(self, source_name: str) -> bool:
-        """检查源是否健康"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT is_healthy FROM source_health WHERE source_name = ?', (source_name,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else True
+        """是否应请求该源：closed 与 half_open（探测）时为 True"""
+        return self.state(source_name) != self.OPEN
     
     def get_weight(self, source_name: str) -> float:
         """获取源权重"""
+        row = self._rows.get(source_name)
+        return row['weight'] if row and row['weight'] is not None else 1.0
+    
+    def health_counts(self) -> Tuple[int, int]:
+        """返回 (未熔断源数量, 源总数)"""
+        with self._lock:
+            rows = list(self._rows.values())
+        return sum(1 for row in rows if self._state(row) == self.CLOSED), len(rows)
+    
+    def save(self):
+        """将变化的健康状态写回数据库（单个事务）"""
+        with self._lock:
+            rows = [
+                (name, *(self._rows[name][c] for c in self.COLUMNS))
+                for name in self._dirty
+            ]
+            self._dirty.clear()
+            self._last_flush = time.monotonic()
+        if not rows:
+            return
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT weight FROM source_health WHERE source_name = ?', (source_name,))
-        result = cursor.fetchone()
+        with conn:
+            conn.executemany(f'''
+                INSERT OR REPLACE INTO source_health
+                (source_name, {', '.join(self.COLUMNS)})
+                VALUES ({', '.join('?' * (len(self.COLUMNS) + 1))})
+            ''', rows)
         conn.close()
-        return result[0] if result else 1.0
 
 class NewsCache:
-    """新闻缓存管理器"""
+    """
+    新闻缓存管理器
+    整个运行期间复用一个 SQLite 连接（WAL 模式），批量写入在单个事务中完成；
+    支持 with 语句，退出时关闭连接
+    """
+
+    INSERT_SQL = '''
+        INSERT OR REPLACE INTO news_cache 
+        (title, summary, url, source, category, weight, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
     def __init__(self, db_path="news_cache.db"):
         self.db_path = db_path
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
         self.init_db()
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
     def init_db(self):
         """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS news_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT,
-                summary TEXT,
-                url TEXT,
-                source TEXT,
-                category TEXT,
-                weight REAL,
-                timestamp TIMESTAMP,
-                UNIQUE(title, source)
-            )
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_timestamp ON news_cache(timestamp)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_category ON news_cache(category)
-        ''')
-        conn.commit()
-        conn.close()
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS news_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT,
+                    summary TEXT,
+                    url TEXT,
+                    source TEXT,
+                    category TEXT,
+                    weight REAL,
+                    timestamp TIMESTAMP,
+                    UNIQUE(title, source)
+                )
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_timestamp ON news_cache(timestamp)
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_category ON news_cache(category)
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS news_clusters (
+                    cluster_id TEXT,
+                    url TEXT,
+                    title TEXT,
+                    source TEXT,
+                    is_representative INTEGER,
+                    timestamp TIMESTAMP,
+                    PRIMARY KEY (cluster_id, url)
+                )
+            ''')
     
     def add_news(self, news_item: Dict[str, Any], category: str, weight: float = 1.0):
         """添加新闻到缓存"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.add_many([(news_item, category, weight)])
+    
+    def add_many(self, entries: List[Tuple[Dict[str, Any], str, float]]):
+        """批量添加新闻到缓存：entries 为 (新闻, 分类, 权重)，单个事务写入"""
+        now = datetime.now()
+        rows = [(
+            news_item.get('title', ''),
+            news_item.get('summary', ''),
+            news_item.get('url', ''),
+            news_item.get('source', ''),
+            category,
+            weight,
+            now
+        ) for news_item, category, weight in entries]
+        if not rows:
+            return
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO news_cache 
-                (title, summary, url, source, category, weight, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                news_item.get('title', ''),
-                news_item.get('summary', ''),
-                news_item.get('url', ''),
-                news_item.get('source', ''),
-                category,
-                weight,
-                datetime.now()
-            ))
-            conn.commit()
+            with self.conn:
+                self.conn.executemany(self.INSERT_SQL, rows)
         except Exception as e:
             log(f"缓存添加失败: {e}")
-        finally:
-            conn.close()
+    
+    def add_clusters(self, representatives: List[Dict[str, Any]]):
+        """记录近似重复簇成员（仅记录包含多条的簇），单个事务写入"""
+        now = datetime.now()
+        rows = []
+        for rep in representatives:
+            if rep.get('cluster_size', 1) <= 1:
+                continue
+            rows.append((rep['cluster_id'], rep.get('url', ''), rep.get('title', ''), rep.get('source', ''), 1, now))
+            for member in rep.get('cluster_members', []):
+                rows.append((rep['cluster_id'], member.get('url') or '', member.get('title') or '', member.get('source') or '', 0, now))
+        if not rows:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany('''
+                    INSERT OR REPLACE INTO news_clusters
+                    (cluster_id, url, title, source, is_representative, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+        except Exception as e:
+            log(f"聚类记录失败: {e}")
     
     def get_cached_news(self, category: str, limit: int = 10) -> List[Dict[str, Any]]:
         """获取缓存的新闻"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        cursor = self.conn.execute('''
             SELECT title, summary, url, source, weight, timestamp
             FROM news_cache 
             WHERE category = ? 
@@ -167,18 +335,14 @@ class NewsCache:
                 'weight': row[4],
                 'timestamp': row[5]
             })
-        
-        conn.close()
         return results
     
     def cleanup_old_news(self, hours: int = 24):
         """清理旧新闻"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        cursor.execute('DELETE FROM news_cache WHERE timestamp < ?', (cutoff_time,))
-        conn.commit()
-        conn.close()
+        with self.conn:
+            self.conn.execute('DELETE FROM news_cache WHERE timestamp < ?', (cutoff_time,))
+            self.conn.execute('DELETE FROM news_clusters WHERE timestamp < ?', (cutoff_time,))
 
 def get_beijing_timestamp():
     """获取北京时间戳"""
@@ -186,16 +350,37 @@ def get_beijing_timestamp():
     beijing_time = utc_now + timedelta(hours=8)
     return beijing_time.strftime("%Y-%m-%d %H:%M")
 
+# 提示词模板版本：修改 summarize_text / translate_with_gemini 的提示词时同步修改，使旧缓存失效
+SUMMARY_PROMPT_VERSION = 'summarize_text:v1'
+TRANSLATE_PROMPT_VERSION = 'translate:v1'
+BATCH_PROMPT_VERSION = 'translate_summarize_batch:v1'
+
+# 批量翻译+摘要：每次调用包含的新闻条数与每条正文的最大字符数
+GEMINI_BATCH_SIZE = 10
+GEMINI_BATCH_CONTENT_CHARS = 600
+
+# Telegram 消息长度上限（超出部分截断）；渲染时标题与摘要的最大字数（预估渲染长度使用同一上限）
+TELEGRAM_MESSAGE_LIMIT = 4000
+RENDERED_TITLE_CHARS = 80
+RENDERED_SUMMARY_CHARS = 60
+
+BATCH_INSTRUCTIONS = (
+    "你是新闻编辑。下面是若干条新闻，每条以 [编号] 开头。对每一条：\n"
+    "1. title：将标题翻译为简体中文（已是中文则原样保留）；\n"
+    "2. summary：用简体中文在60字内概述关键信息，不要加‘标题/内容’等标签。\n"
+    "仅输出一个 JSON 对象，键为新闻编号，值为 {\"title\": \"...\", \"summary\": \"...\"}；"
+    "不要任何解释、前后缀或代码块标记。"
+)
+
 def setup_gemini():
-    """设置 Gemini API"""
+    """设置 Gemini API（与 summarizer 共享同一模型实例）"""
     api_key = os.getenv('GEMINI_API_KEY')
     if not api_key:
         log("⚠️ 未设置 GEMINI_API_KEY，将使用基础功能")
         return None
     
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = get_gemini_model(api_key)
         log("✅ Gemini API 配置成功")
         return model
     except Exception as e:
@@ -247,6 +432,10 @@ def clean_ai_artifacts(text: str) -> str:
     cleaned = sanitize_text(cleaned)
     return cleaned
 
+def model_name(model) -> str:
+    """模型名称（用于缓存键）"""
+    return getattr(model, 'model_name', None) or 'gemini'
+
 def summarize_text(model, title: str, content: str, fallback_chars: int = 90) -> str:
     """生成简短摘要"""
     raw = (content or "")
@@ -259,12 +448,18 @@ def summarize_text(model, title: str, content: str, fallback_chars: int = 90) ->
                 "用简体中文在60字内概述关键信息。\n\n"
                 f"标题：{title}\n内容：{content}"
             )
-            resp = model.generate_content(prompt)
-            summary = clean_ai_artifacts((resp.text or "").strip())
-            summary = summary.strip('"').strip("'")
-            if len(summary) > 60:
-                summary = summary[:57] + "..."
-            return summary
+
+            def generate():
+                resp = generate_content(model, prompt)
+                summary = clean_ai_artifacts((resp.text or "").strip())
+                summary = summary.strip('"').strip("'")
+                if len(summary) > 60:
+                    summary = summary[:57] + "..."
+                return summary
+
+            return get_summary_cache().memoize(
+                SUMMARY_PROMPT_VERSION, model_name(model), f"{title}\n{content}", generate
+            )
         except Exception:
             pass
     clean = raw.replace("\n", " ").strip()
@@ -286,13 +481,394 @@ def translate_with_gemini(model, text):
             "不要出现‘标题/内容/翻译为/如下’等提示语；保持简洁准确：\n\n"
             f"{text}"
         )
-        response = model.generate_content(prompt)
-        translated = (response.text or "").strip()
-        return clean_ai_artifacts(translated)
+
+        def generate():
+            response = generate_content(model, prompt)
+            translated = (response.text or "").strip()
+            return clean_ai_artifacts(translated)
+
+        return get_summary_cache().memoize(TRANSLATE_PROMPT_VERSION, model_name(model), text, generate)
     except Exception as e:
         log(f"⚠️ 翻译失败: {e}")
         return text
 
+def _clean_batch_summary(summary: str) -> str:
+    """与 summarize_text 相同的摘要后处理"""
+    summary = clean_ai_artifacts((summary or "").strip())
+    summary = summary.strip('"').strip("'")
+    if len(summary) > 60:
+        summary = summary[:57] + "..."
+    return summary
+
+def translate_and_summarize_batch(model, news_list: List[Dict[str, Any]], batch_size: int = GEMINI_BATCH_SIZE) -> List[Tuple[str, str]]:
+    """
+    批量翻译标题并生成摘要：每 batch_size 条新闻合并为一次 Gemini 调用，输出以编号为键的 JSON
+
+    已缓存的条目不再请求；JSON 解析失败或缺少某条结果时，该条回退到
+    translate_with_gemini + summarize_text 逐条调用
+
+    Returns:
+        与 news_list 顺序一致的 (标题, 摘要) 列表
+    """
+    results: List[Optional[Tuple[str, str]]] = [None] * len(news_list)
+    if not model:
+        return [
+            (news.get('title', ''), summarize_text(None, news.get('title', ''), news.get('content', '')))
+            for news in news_list
+        ]
+
+    cache = get_summary_cache()
+    name = model_name(model)
+    cache_texts = [f"{news.get('title', '')}\n{news.get('content', '')}" for news in news_list]
+    pending = []
+    for i, text in enumerate(cache_texts):
+        cached = cache.get(BATCH_PROMPT_VERSION, name, text)
+        if cached:
+            results[i] = tuple(json.loads(cached))
+        else:
+            pending.append(i)
+
+    batches = [
+        {
+            str(i): f"标题：{news_list[i].get('title', '')}\n内容：{(news_list[i].get('content') or '')[:GEMINI_BATCH_CONTENT_CHARS]}"
+            for i in pending[start:start + batch_size]
+        }
+        for start in range(0, len(pending), batch_size)
+    ]
+    # 各批次在 RPM/TPM 限制下并发请求；逐条回退共用同一执行器的限额
+    executor = LLMExecutor()
+    outputs = executor.map(
+        lambda blocks: generate_json_batch(model, blocks, BATCH_INSTRUCTIONS),
+        batches,
+        estimate_tokens=lambda blocks: (len(BATCH_INSTRUCTIONS) + sum(len(b) for b in blocks.values())) // 3 + 80 * len(blocks),
+        fallback=lambda blocks: {},
+    )
+    for blocks, output in zip(batches, outputs):
+        for i in map(int, blocks):
+            entry = output.get(str(i))
+            if not isinstance(entry, dict):
+                continue
+            original_title = news_list[i].get('title', '')
+            title = original_title if re.search(r"[\u4e00-\u9fff]", original_title) else clean_ai_artifacts(str(entry.get('title') or '').strip())
+            summary = _clean_batch_summary(str(entry.get('summary') or ''))
+            if title and summary:
+                results[i] = (title, summary)
+                cache.put(BATCH_PROMPT_VERSION, name, cache_texts[i], json.dumps([title, summary], ensure_ascii=False))
+
+    # 逐条回退
+    fallbacks = [i for i, result in enumerate(results) if result is None]
+    if fallbacks and pending:
+        log(f"⚠️ 批量结果缺失 {len(fallbacks)} 条，逐条调用")
+
+    def translate_and_summarize(i):
+        news = news_list[i]
+        return (
+            translate_with_gemini(model, news.get('title', '')),
+            summarize_text(model, news.get('title', ''), news.get('content', '')),
+        )
+
+    fallback_results = executor.map(
+        translate_and_summarize,
+        fallbacks,
+        # 每条两次调用：翻译标题 + 摘要
+        estimate_tokens=lambda i: (2 * len(news_list[i].get('title') or '') + len(news_list[i].get('content') or '')) // 3 + 200,
+        fallback=lambda i: (news_list[i].get('title', ''), summarize_text(None, news_list[i].get('title', ''), news_list[i].get('content', ''))),
+    )
+    for i, result in zip(fallbacks, fallback_results):
+        results[i] = result
+    return results
+
+# RSS 抓取并发配置：并发数、单源时间预算（秒）、整个 RSS 阶段总时限（秒）
+RSS_MAX_WORKERS = 8
+RSS_SOURCE_BUDGET = 25
+RSS_STAGE_DEADLINE = 90
+# 每个源只使用前几条
+RSS_ITEMS_PER_SOURCE = 2
+# 镜像对冲：首选镜像在该时间（秒）内未返回则并行请求次优镜像
+MIRROR_HEDGE_DELAY = 1.5
+
+RSS_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+}
+
+RSS_KEYWORDS = ['trump', 'biden', 'president', 'election', 'china', 'russia', 'ukraine', 'israel', 'palestine', 'economy', 'market', 'trade', 'war', 'conflict', 'politics', 'government', 'congress', 'senate', 'bill', 'proposal', 'bitcoin', 'crypto', 'cryptocurrency', 'stock', 'nasdaq', 'dow', 's&p', 'sp500', 'lithium', 'nickel', 'cobalt', 'rare earth', 'graphite']
+CHINA_US_KEYWORDS = ['china', 'chinese', 'beijing', 'taiwan', 'trade war', 'tariff', 'semiconductor', 'huawei', 'tiktok']
+RSS_MATCHER = KeywordMatcher(RSS_KEYWORDS)
+CHINA_US_MATCHER = KeywordMatcher(CHINA_US_KEYWORDS)
+
+# 分类关键词：主匹配决定条目所属栏目，*_wide 为补齐时的宽匹配
+NEWS_CATEGORIES = ('trump', 'china_us', 'ru_ua', 'minerals', 'crypto_markets')
+NEWS_CATEGORIZER = KeywordCategorizer({
+    'trump': ['trump'],
+    'china_us': ['china'],
+    'ru_ua': ['ukraine', 'zelensky', 'russia', 'kremlin', 'putin', 'donbas', 'crimea'],
+    'minerals': ['lithium', 'nickel', 'cobalt', 'rare earth', 'graphite', 'copper', 'critical mineral', 'mining', 'battery metal'],
+    'crypto_markets': ['bitcoin', 'crypto', 'cryptocurrency', 'ethereum', 'nasdaq', 'dow', 's&p', 'sp500', 'stocks', 'markets', 'equities', 'fed'],
+    'china_us_wide': ['china', 'beijing', 'taiwan', 'tariff', 'semiconductor', 'huawei', 'tiktok', 'congress', 'bipartisan'],
+    'ru_ua_wide': ['ukraine', 'russia', 'kremlin', 'moscow', 'kyiv', 'nato'],
+    'minerals_wide': ['lithium', 'nickel', 'cobalt', 'rare earth', 'graphite', 'copper', 'mining', 'battery'],
+    'crypto_markets_wide': ['bitcoin', 'crypto', 'ethereum', 'nasdaq', 'dow', 's&p', 'sp500', 'stocks', 'market'],
+})
+# 特朗普的宽匹配只看正文
+TRUMP_WIDE_MATCHER = KeywordMatcher(['white house', 'president'])
+
+
+def news_text(item: Dict[str, Any]) -> str:
+    """标题与正文合并后的小写文本，用于关键词匹配"""
+    return f"{(item.get('title') or '').lower()}\n{(item.get('content') or '').lower()}"
+
+
+def categorize_news(all_news: List[Dict[str, Any]]) -> None:
+    """
+    单次遍历为每条新闻打上全部分类标签，写入 item['categories']
+
+    RSS 阶段已标记为 china_us 的条目直接归入中美栏目；涉及特朗普的条目只归入特朗普栏目
+    """
+    for item in all_news:
+        labels = NEWS_CATEGORIZER.categorize(news_text(item), prepared=True)
+        if item.get('type') == 'china_us':
+            labels.add('china_us')
+        if 'trump' in labels:
+            labels.discard('china_us')
+        if TRUMP_WIDE_MATCHER.search((item.get('content') or '').lower(), prepared=True):
+            labels.add('trump_wide')
+        item['categories'] = labels
+
+
+def weight_sort_key(item: Dict[str, Any]) -> float:
+    """权重排序键：权重×时间新鲜度"""
+    weight = item.get('weight', 1.0)
+    time_str = item.get('time', '')
+    # 简单的时间新鲜度评分（越新越高）
+    time_score = 1.0
+    if 'today' in time_str.lower() or 'just' in time_str.lower():
+        time_score = 1.0
+    elif 'hour' in time_str.lower():
+        time_score = 0.9
+    elif 'minute' in time_str.lower():
+        time_score = 0.95
+    else:
+        time_score = 0.8
+    return weight * time_score
+
+
+def unique_key(item: Dict[str, Any]) -> str:
+    """回填去重键：规范化标题"""
+    return (item.get('title','').strip().lower())
+
+
+class RankedNewsPool:
+    """
+    补齐候选池：全部新闻按 weight_sort_key 只排序一次，并为每个分类标签建立按排名有序的索引；
+    各栏目补齐时沿对应索引顺序取用，取满即停，无需重复排序和全量扫描
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = sorted(items, key=weight_sort_key, reverse=True)
+        self._rank = {id(item): i for i, item in enumerate(self.items)}
+        self._keys = [unique_key(item) for item in self.items]
+        self._by_label: Dict[str, List[int]] = {}
+        for i, item in enumerate(self.items):
+            for label in item.get('categories', ()):
+                self._by_label.setdefault(label, []).append(i)
+
+    def fill(self, primary: List[Dict[str, Any]], target: int, wide_label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        将 primary 补齐到 target 条：先取带 wide_label 标签的条目，再按排名取任意条目
+
+        Returns:
+            按排名排序的前 target 条
+        """
+        positions = [self._rank[id(item)] for item in primary]
+        if len(positions) < target:
+            selected_keys = {unique_key(item) for item in primary}
+
+            def take(indices):
+                for i in indices:
+                    if len(positions) >= target:
+                        break
+                    if self._keys[i] in selected_keys:
+                        continue
+                    positions.append(i)
+                    selected_keys.add(self._keys[i])
+
+            # 第一轮：按宽匹配标签补齐
+            if wide_label:
+                take(self._by_label.get(wide_label, ()))
+            # 第二轮：任意最新补齐
+            take(range(len(self.items)))
+        return [self.items[i] for i in sorted(positions)[:target]]
+
+
+def plan_message_budget(
+    sections: List[Tuple[List[Dict[str, Any]], int]],
+    size_of: Callable[[int, Dict[str, Any]], int],
+    budget: int,
+) -> List[List[Dict[str, Any]]]:
+    """
+    消息预算规划：在调用模型之前按展示顺序估算每条新闻渲染后的长度，只选出放得进 budget 字符的条目
+
+    每个栏目最多取 max_items 条，遇到放不下的条目即停止该栏目（后续栏目中较短的条目仍可放入），
+    因此只有最终会出现在消息中的条目需要翻译和摘要
+
+    Args:
+        sections: (候选条目, 最多展示条数) 列表
+        size_of: size_of(序号, 条目) 返回该条目渲染后占用的字符数
+        budget: 可用于条目的字符数（已扣除头部、栏目标题与尾部）
+
+    Returns:
+        与 sections 顺序一致的各栏目选中条目
+    """
+    planned = []
+    for items, max_items in sections:
+        chosen: List[Dict[str, Any]] = []
+        for news in items[:max_items]:
+            size = size_of(len(chosen) + 1, news)
+            if size > budget:
+                break
+            budget -= size
+            chosen.append(news)
+        planned.append(chosen)
+    return planned
+
+
+# parse_rss_items 产出条目的缓存命名空间；截取条数或条目结构变化时递增版本
+RSS_ITEMS_NAMESPACE = 'rss_items/v1'
+
+
+def parse_rss_items(chunks) -> List[Dict[str, Any]]:
+    """流式解析 RSS 条目（title/link/description/pubDate），只读取前 RSS_ITEMS_PER_SOURCE 条"""
+    return list(iter_feed_items(chunks, limit=RSS_ITEMS_PER_SOURCE))
+
+# 并发抓取时按主机限速（多个社交源共用同一镜像主机）
+_rss_rate_limiter = http_client.HostRateLimiter(min_interval=0.3)
+
+class WaitTracker:
+    """累计单个源在限速器与重试退避上的等待秒数（线程安全；对冲请求的并行等待会分别计入）"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.seconds += seconds
+
+def get_with_retry(u, headers, timeout=10, retries=3, deadline=None, stream=False, waits: Optional[WaitTracker] = None):
+    """带重试的请求（指数退避）；deadline 为 time.monotonic() 截止时刻，超出则不再重试；waits 累计限速与退避等待时间"""
+    delay = 1
+    for attempt in range(retries):
+        request_timeout = timeout
+        wait_start = time.monotonic()
+        if deadline is None:
+            _rss_rate_limiter.wait(u)
+        else:
+            # 先检查截止时刻，限速等待也不超过剩余时间
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not _rss_rate_limiter.wait(u, timeout=remaining):
+                raise requests.Timeout(f"超出单源时间预算: {u}")
+        if waits is not None:
+            waits.add(time.monotonic() - wait_start)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"超出单源时间预算: {u}")
+            request_timeout = min(timeout, remaining)
+        try:
+            return http_client.get(u, headers=headers, timeout=request_timeout, stream=stream)
+        except requests.RequestException:
+            if attempt == retries - 1:
+                raise
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            if waits is not None:
+                waits.add(delay)
+            delay = min(delay * 2, 8)
+
+def fetch_social_rss_items(handle: str, nitter_mirrors: List[str], rsshub_mirrors: List[str], selector: MirrorSelector, deadline=None, waits: Optional[WaitTracker] = None):
+    """社交源：Nitter/RSSHub 镜像按历史延迟与成功率排序，对冲请求取最快的成功结果"""
+    candidates = []
+    for base in nitter_mirrors:
+        base = base.rstrip('/')
+        candidates.append((base, f"{base}/{handle}/rss"))
+    for rb in rsshub_mirrors:
+        rb = rb.rstrip('/')
+        # 优先使用 /x/user/:id
+        candidates.append((rb, f"{rb}/x/user/{handle}"))
+
+    def fetch_one(social_url):
+        r = get_with_retry(social_url, RSS_HEADERS, timeout=12, retries=1, deadline=deadline, stream=True, waits=waits)
+        if r.status_code != 200:
+            r.close()
+            return None
+        return list(iter_response_items(r, limit=RSS_ITEMS_PER_SOURCE)) or None
+
+    return hedged_fetch(
+        selector.rank(candidates),
+        fetch_one,
+        selector,
+        hedge_delay=MIRROR_HEDGE_DELAY,
+        deadline=deadline,
+    )
+
+def timed_call(fn, *args, **kwargs) -> Tuple[Any, float]:
+    """调用 fn 并返回 (结果, 耗时秒数)"""
+    start = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, time.monotonic() - start
+
+def fetch_rss_source(name: str, url: str, weight: float, *, nitter_mirrors: List[str], rsshub_mirrors: List[str], mirror_selector: MirrorSelector, budget: float = RSS_SOURCE_BUDGET, waits: Optional[WaitTracker] = None) -> List[Dict[str, Any]]:
+    """抓取单个 RSS 源并按关键词筛选，返回新闻条目；在 budget 秒内未完成则放弃重试，获取失败时抛出 RuntimeError"""
+    deadline = time.monotonic() + budget
+    if name.startswith('Twitter-'):
+        handle = name.split('Twitter-')[-1]
+        try:
+            rss_items = fetch_social_rss_items(handle, nitter_mirrors, rsshub_mirrors, mirror_selector, deadline=deadline, waits=waits)
+        except Exception:
+            rss_items = None
+    else:
+        # 条件请求：未变化的 RSS 返回 304，直接复用上次解析的条目
+        rss_items = fetch_feed(
+            url,
+            parse_rss_items,
+            namespace=RSS_ITEMS_NAMESPACE,
+            headers=RSS_HEADERS,
+            timeout=10,
+            getter=lambda u, h, t: get_with_retry(u, h, timeout=t, retries=3, deadline=deadline, stream=True, waits=waits),
+        )
+    if rss_items is None:
+        # 抛出异常以便调用方计入熔断统计
+        raise RuntimeError("RSS 获取失败")
+
+    news = []
+    for item in (rss_items or [])[:RSS_ITEMS_PER_SOURCE]:
+        if item['title'] is None or item['link'] is None:
+            continue
+        title = item['title']
+        description = item['description'] or ""
+        # 关键词筛选
+        content = f"{title} {description}".lower()
+        if RSS_MATCHER.search(content, prepared=True):
+            news_type = 'china_us' if CHINA_US_MATCHER.search(content, prepared=True) else 'general'
+            news.append({
+                'title': title,
+                'content': description,
+                'source': name,
+                'time': item['pubDate'] or "",
+                'url': item['link'],
+                'type': news_type,
+                'weight': weight
+            })
+    return news
+
+def fetch_rss_source_timed(*args, **kwargs) -> Tuple[List[Dict[str, Any]], float]:
+    """调用 fetch_rss_source，返回 (新闻条目, 扣除限速与重试退避等待后的耗时秒数)"""
+    waits = WaitTracker()
+    news, elapsed = timed_call(fetch_rss_source, *args, waits=waits, **kwargs)
+    return news, max(0.0, elapsed - waits.seconds)
+
 def fetch_all_news_sources(model):
     """获取所有新闻源"""
     log("📝 生成综合新闻简报...")
@@ -311,7 +887,7 @@ def fetch_all_news_sources(model):
                 'max': 5
             }
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get(url, params=params, headers=headers, timeout=15)
+            response = http_client.get(url, params=params, headers=headers, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -341,7 +917,7 @@ def fetch_all_news_sources(model):
                     'country': 'us',
                     'max': 2
                 }
-                response = requests.get(url, params=params, headers=headers, timeout=15)
+                response = http_client.get(url, params=params, headers=headers, timeout=15)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -363,6 +939,9 @@ def fetch_all_news_sources(model):
     # 从配置读取来源，primary 优先
     rss_sources = []
     health_monitor = SourceHealthMonitor()
+    nitter_mirrors = ["https://nitter.net"]
+    rsshub_mirrors = ['https://rsshub.app']
+    mirror_selector = MirrorSelector()
     try:
         with open('sources.json', 'r', encoding='utf-8') as f:
             cfg = json.load(f)
@@ -371,19 +950,19 @@ def fetch_all_news_sources(model):
                 if health_monitor.is_healthy(s['name']):
                     rss_sources.append((s['name'], s['url'], 1.0))  # 优先源权重1.0
                 else:
-                    log(f"⚠️ 优先源 {s['name']} 不健康，跳过")
+                    log(f"⚠️ 优先源 {s['name']} 已熔断，跳过")
             # 次级源
             for s in cfg.get('secondary', []):
                 if health_monitor.is_healthy(s['name']):
                     rss_sources.append((s['name'], s['url'], 0.8))  # 次级源权重0.8
                 else:
-                    log(f"⚠️ 次级源 {s['name']} 不健康，跳过")
-            # 可选社交代理 RSS（基于分组与权重+镜像轮换）
+                    log(f"⚠️ 次级源 {s['name']} 已熔断，跳过")
+            # 可选社交代理 RSS（基于分组与权重+镜像择优）
             social_groups = cfg.get('social_groups', {})
             nitter_mirrors = cfg.get('nitter_mirrors', ["https://nitter.net"]) 
-            mirror_idx = random.randint(0, len(nitter_mirrors)-1)
+            rsshub_mirrors = cfg.get('rsshub_mirrors', ['https://rsshub.app'])
             def nitter_url(handle: str) -> str:
-                base = nitter_mirrors[mirror_idx % len(nitter_mirrors)].rstrip('/')
+                base = nitter_mirrors[0].rstrip('/')
                 return f"{base}/{handle}/rss"
             for group_name, group in social_groups.items():
                 if group.get('enabled'):
@@ -393,7 +972,7 @@ def fetch_all_news_sources(model):
                         if health_monitor.is_healthy(source_name):
                             rss_sources.append((source_name, nitter_url(handle), group_weight))
                         else:
-                            log(f"⚠️ 社交源 {source_name} 不健康，跳过")
+                            log(f"⚠️ 社交源 {source_name} 已熔断，跳过")
     except Exception:
         # 回退内置
         rss_sources = [
@@ -409,104 +988,49 @@ def fetch_all_news_sources(model):
             ("Bloomberg", "https://feeds.bloomberg.com/markets/news.rss", 0.8)
         ]
     
-    for name, url, weight in rss_sources:
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-            }
-            
-            # 带重试的请求（指数退避）
-            def get_with_retry(u, headers, timeout=10, retries=3):
-                delay = 1
-                for attempt in range(retries):
-                    try:
-                        return requests.get(u, headers=headers, timeout=timeout)
-                    except requests.RequestException:
-                        if attempt == retries - 1:
-                            raise
-                        time.sleep(delay)
-                        delay = min(delay * 2, 8)
-
-            response_text = None
-            # 社交源：镜像轮换 + RSSHub 兜底
-            if name.startswith('Twitter-'):
-                try:
-                    handle = name.split('Twitter-')[-1]
-                    # 尝试 Nitter 镜像，最多尝试全部镜像
-                    tried = 0
-                    for offset in range(len(nitter_mirrors)):
-                        base = nitter_mirrors[(mirror_idx + offset) % len(nitter_mirrors)].rstrip('/')
-                        social_url = f"{base}/{handle}/rss"
-                        try:
-                            r = get_with_retry(social_url, headers, timeout=10, retries=2)
-                            if r.status_code == 200 and r.text.strip():
-                                response_text = r.text
-                                break
-                        except Exception:
-                            pass
-                        tried += 1
-                    # 若全部 Nitter 失败，尝试 RSSHub
-                    if not response_text:
-                        rsshub_mirrors = cfg.get('rsshub_mirrors', ['https://rsshub.app'])
-                        for rb in rsshub_mirrors:
-                            rb = rb.rstrip('/')
-                            # 优先使用 /x/user/:id
-                            social_url = f"{rb}/x/user/{handle}"
-                            try:
-                                r = get_with_retry(social_url, headers, timeout=12, retries=2)
-                                if r.status_code == 200 and r.text.strip():
-                                    response_text = r.text
-                                    break
-                            except Exception:
-                                pass
-                except Exception:
-                    response_text = None
-            else:
-                resp = get_with_retry(url, headers, timeout=10, retries=3)
-                if resp.status_code == 200:
-                    response_text = resp.text
-
-            if response_text:
-                root = ET.fromstring(response_text)
-                items = root.findall('.//item')
-                
-                for item in items[:2]:
-                    title_elem = item.find('title')
-                    link_elem = item.find('link')
-                    description_elem = item.find('description')
-                    pub_date_elem = item.find('pubDate')
-                    
-                    if title_elem is not None and link_elem is not None:
-                        title = title_elem.text
-                        link = link_elem.text
-                        description = description_elem.text if description_elem is not None else ""
-                        pub_date = pub_date_elem.text if pub_date_elem is not None else ""
-                        
-                        # 关键词筛选
-                        keywords = ['trump', 'biden', 'president', 'election', 'china', 'russia', 'ukraine', 'israel', 'palestine', 'economy', 'market', 'trade', 'war', 'conflict', 'politics', 'government', 'congress', 'senate', 'bill', 'proposal', 'bitcoin', 'crypto', 'cryptocurrency', 'stock', 'nasdaq', 'dow', 's&p', 'sp500', 'lithium', 'nickel', 'cobalt', 'rare earth', 'graphite']
-                        content = f"{title} {description}".lower()
-                        
-                        if any(keyword in content for keyword in keywords):
-                            news_type = 'china_us' if any(word in content for word in ['china', 'chinese', 'beijing', 'taiwan', 'trade war', 'tariff', 'semiconductor', 'huawei', 'tiktok']) else 'general'
-                            news_item = {
-                                'title': title,
-                                'content': description,
-                                'source': name,
-                                'time': pub_date,
-                                'url': link,
-                                'type': news_type,
-                                'weight': weight
-                            }
-                            all_news.append(news_item)
-                            # 记录成功
-                            health_monitor.record_success(name, weight)
-            
-            time.sleep(1)
-        except Exception as e:
-            log(f"❌ {name}: {e}")
-            # 记录失败
+    # 并发抓取：每个源有独立时间预算，整个阶段有总时限，超时未完成的源直接放弃
+    stage_start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=RSS_MAX_WORKERS)
+    probes = [name for name, _, _ in rss_sources if health_monitor.state(name) == SourceHealthMonitor.HALF_OPEN]
+    if probes:
+        log(f"🔎 熔断期已过，探测 {len(probes)} 个源: {', '.join(probes[:10])}")
+    futures = {
+        executor.submit(
+            fetch_rss_source_timed, name, url, weight,
+            nitter_mirrors=nitter_mirrors,
+            rsshub_mirrors=rsshub_mirrors,
+            mirror_selector=mirror_selector,
+            budget=RSS_SOURCE_BUDGET,
+        ): (name, weight)
+        for name, url, weight in rss_sources
+    }
+    try:
+        for future in as_completed(futures, timeout=RSS_STAGE_DEADLINE):
+            name, weight = futures[future]
+            try:
+                source_news, elapsed = future.result()
+            except Exception as e:
+                log(f"❌ {name}: {e}")
+                # 记录失败
+                health_monitor.record_failure(name)
+                continue
+            all_news.extend(source_news)
+            # 记录成功（扣除等待后的慢请求按失败计入熔断）
+            health_monitor.record_success(name, weight, latency=elapsed)
+    except FuturesTimeoutError:
+        # 只有已开始执行的源计入失败；仍在队列中未执行的源由 shutdown 取消，不影响其健康状态
+        running = [futures[f][0] for f in futures if f.running()]
+        queued = [futures[f][0] for f in futures if not f.done() and not f.running()]
+        log(f"⏰ RSS 阶段超过总时限 {RSS_STAGE_DEADLINE} 秒，放弃 {len(running)} 个未完成的源: {', '.join(running[:10])}")
+        if queued:
+            log(f"⏭️ 未开始执行的 {len(queued)} 个源本次跳过: {', '.join(queued[:10])}")
+        for name in running:
             health_monitor.record_failure(name)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        mirror_selector.save()
+        health_monitor.save()
+    log(f"✅ RSS 阶段完成: {len(rss_sources)} 个源，用时 {time.monotonic() - stage_start:.1f} 秒")
     
     # 4. Gemini 搜索补充
     if model:
@@ -520,7 +1044,7 @@ def fetch_all_news_sources(model):
         for query in search_queries:
             try:
                 prompt = f"请搜索关于'{query}'的最新新闻，提供2条最重要的新闻，格式为JSON：[{{\"title\": \"标题\", \"content\": \"内容\", \"source\": \"来源\", \"time\": \"时间\", \"url\": \"链接\"}}]"
-                response = model.generate_content(prompt)
+                response = generate_content(model, prompt)
                 result_text = response.text
                 
                 try:
@@ -548,6 +1072,16 @@ def fetch_all_news_sources(model):
             seen_titles.add(title)
             unique_news.append(news)
     
+    # 近似重复聚类：不同来源转载的同一报道只保留权重最高的一条
+    before = len(unique_news)
+    unique_news = cluster_near_duplicates(
+        unique_news,
+        text_of=near_duplicate_text,
+        weight_of=lambda n: n.get('weight', 1.0),
+    )
+    if len(unique_news) < before:
+        log(f"🧩 近似重复聚类: {before} -> {len(unique_news)} 条")
+    
     unique_news.sort(key=lambda x: x.get('time', ''), reverse=True)
     
     log(f"📊 总共收集 {len(unique_news)} 条新闻")
@@ -567,7 +1101,7 @@ def send_telegram_message(bot_token, chat_id, text):
     
     try:
         log(f"消息长度: {len(text)} 字符")
-        response = requests.post(url, json=payload, timeout=30)
+        response = http_client.post(url, json=payload, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -608,129 +1142,39 @@ def main():
         # 3. 获取所有新闻
         all_news = fetch_all_news_sources(model)
         
-        # 4. 初始化缓存和健康监控
-        news_cache = NewsCache()
+        # 4. 初始化健康监控
         health_monitor = SourceHealthMonitor()
         
-        # 清理旧缓存
-        news_cache.cleanup_old_news(24)
-        
         # 5. 分类新闻（新增标签：俄乌冲突、关键矿产、虚拟货币与全球股市）
-        lower = lambda s: (s or '').lower()
-        trump_news = [n for n in all_news if 'trump' in lower(n.get('title')) or 'trump' in lower(n.get('content'))]
-        china_us_news = [n for n in all_news if (n.get('type') == 'china_us' or 'china' in lower(n.get('title')) or 'china' in lower(n.get('content'))) and n not in trump_news]
-        ru_ua_news = [n for n in all_news if any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['ukraine','zelensky','russia','kremlin','putin','donbas','crimea'])]
-        minerals_news = [n for n in all_news if any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['lithium','nickel','cobalt','rare earth','graphite','copper','critical mineral','mining','battery metal'])]
-        crypto_markets_news = [n for n in all_news if any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['bitcoin','crypto','cryptocurrency','ethereum','nasdaq','dow','s&p','sp500','stocks','markets','equities','fed'])]
-        other_news = [n for n in all_news if n not in trump_news and n not in china_us_news and n not in ru_ua_news and n not in minerals_news and n not in crypto_markets_news]
+        categorize_news(all_news)
+        trump_news = [n for n in all_news if 'trump' in n['categories']]
+        china_us_news = [n for n in all_news if 'china_us' in n['categories']]
+        ru_ua_news = [n for n in all_news if 'ru_ua' in n['categories']]
+        minerals_news = [n for n in all_news if 'minerals' in n['categories']]
+        crypto_markets_news = [n for n in all_news if 'crypto_markets' in n['categories']]
+        other_news = [n for n in all_news if n['categories'].isdisjoint(NEWS_CATEGORIES)]
         
-        # 权重排序函数：按权重×时间新鲜度排序
-        def weight_sort_key(item):
-            weight = item.get('weight', 1.0)
-            time_str = item.get('time', '')
-            # 简单的时间新鲜度评分（越新越高）
-            time_score = 1.0
-            if 'today' in time_str.lower() or 'just' in time_str.lower():
-                time_score = 1.0
-            elif 'hour' in time_str.lower():
-                time_score = 0.9
-            elif 'minute' in time_str.lower():
-                time_score = 0.95
-            else:
-                time_score = 0.8
-            return weight * time_score
-
-        # 回填工具：将列表补齐到目标条数，优先同主题宽匹配，再次为总体按时间最新
-        def unique_key(item):
-            return (item.get('title','').strip().lower())
-
-        def fill_to_count(primary, target, wide_filter=None):
-            selected_keys = {unique_key(x) for x in primary}
-            result = list(primary)
-            # 候选池：按权重×时间新鲜度排序
-            pool = sorted(all_news, key=weight_sort_key, reverse=True)
-            # 第一轮：按宽匹配条件补齐
-            if wide_filter:
-                for item in pool:
-                    if len(result) >= target:
-                        break
-                    if unique_key(item) in selected_keys:
-                        continue
-                    if wide_filter(item):
-                        result.append(item)
-                        selected_keys.add(unique_key(item))
-            # 第二轮：任意最新补齐
-            for item in pool:
-                if len(result) >= target:
-                    break
-                if unique_key(item) in selected_keys:
-                    continue
-                result.append(item)
-                selected_keys.add(unique_key(item))
-            # 最终按权重排序
-            final_result = sorted(result, key=weight_sort_key, reverse=True)[:target]
-            
-            # 缓存新闻到数据库
-            for item in final_result:
-                category = "trump" if wide_filter and "trump" in str(wide_filter).lower() else "general"
-                news_cache.add_news(item, category, item.get('weight', 1.0))
-            
-            return final_result
-
-        def fill_to_count_with_cache(primary, category, target, wide_filter=None):
-            """带缓存的补齐函数"""
-            selected_keys = {unique_key(x) for x in primary}
-            result = list(primary)
-            # 候选池：按权重×时间新鲜度排序
-            pool = sorted(all_news, key=weight_sort_key, reverse=True)
-            # 第一轮：按宽匹配条件补齐
-            if wide_filter:
-                for item in pool:
-                    if len(result) >= target:
-                        break
-                    if unique_key(item) in selected_keys:
-                        continue
-                    if wide_filter(item):
-                        result.append(item)
-                        selected_keys.add(unique_key(item))
-            # 第二轮：任意最新补齐
-            for item in pool:
-                if len(result) >= target:
-                    break
-                if unique_key(item) in selected_keys:
-                    continue
-                result.append(item)
-                selected_keys.add(unique_key(item))
-            # 最终按权重排序
-            final_result = sorted(result, key=weight_sort_key, reverse=True)[:target]
-            
-            # 缓存新闻到数据库
-            for item in final_result:
-                news_cache.add_news(item, category, item.get('weight', 1.0))
-            
-            return final_result
+        # 各主题按宽匹配标签补齐到10条（候选池只排序一次）
+        pool = RankedNewsPool(all_news)
+        trump_news = pool.fill(trump_news, 10, wide_label='trump_wide')
+        china_us_news = pool.fill(china_us_news, 10, wide_label='china_us_wide')
+        ru_ua_news = pool.fill(ru_ua_news, 10, wide_label='ru_ua_wide')
+        minerals_news = pool.fill(minerals_news, 10, wide_label='minerals_wide')
+        crypto_markets_news = pool.fill(crypto_markets_news, 10, wide_label='crypto_markets_wide')
 
-        # 定义各主题的宽匹配函数并补齐到10条
-        trump_news = fill_to_count_with_cache(
-            trump_news, "trump", 10,
-            wide_filter=lambda n: 'white house' in lower(n.get('content')) or 'president' in lower(n.get('content'))
-        )
-        china_us_news = fill_to_count_with_cache(
-            china_us_news, "china_us", 10,
-            wide_filter=lambda n: any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['china','beijing','taiwan','tariff','semiconductor','huawei','tiktok','congress','bipartisan'])
-        )
-        ru_ua_news = fill_to_count_with_cache(
-            ru_ua_news, "ru_ua", 10,
-            wide_filter=lambda n: any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['ukraine','russia','kremlin','moscow','kyiv','nato'])
-        )
-        minerals_news = fill_to_count_with_cache(
-            minerals_news, "minerals", 10,
-            wide_filter=lambda n: any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['lithium','nickel','cobalt','rare earth','graphite','copper','mining','battery'])
-        )
-        crypto_markets_news = fill_to_count_with_cache(
-            crypto_markets_news, "crypto_markets", 10,
-            wide_filter=lambda n: any(k in lower(n.get('title')) or k in lower(n.get('content')) for k in ['bitcoin','crypto','ethereum','nasdaq','dow','s&p','sp500','stocks','market'])
-        )
+        # 清理旧缓存并批量写入本次新闻
+        with NewsCache() as news_cache:
+            news_cache.cleanup_old_news(24)
+            get_feed_cache().cleanup()
+            news_cache.add_clusters(all_news)
+            news_cache.add_many([
+                (item, category, item.get('weight', 1.0))
+                for category, items in (
+                    ('trump', trump_news), ('china_us', china_us_news), ('ru_ua', ru_ua_news),
+                    ('minerals', minerals_news), ('crypto_markets', crypto_markets_news),
+                )
+                for item in items
+            ])
         
         # 5. 格式化消息（遵循用户提供的出版格式）
         timestamp = get_beijing_timestamp()
@@ -800,18 +1244,7 @@ def main():
             lines.append(f'今日收录：{len(all_news)}条重点新闻')
             
             # 源健康状态统计
-            healthy_sources = 0
-            total_sources = 0
-            try:
-                conn = sqlite3.connect("sources_health.db")
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM source_health WHERE is_healthy = 1")
-                healthy_sources = cursor.fetchone()[0]
-                cursor.execute("SELECT COUNT(*) FROM source_health")
-                total_sources = cursor.fetchone()[0]
-                conn.close()
-            except:
-                pass
+            healthy_sources, total_sources = health_monitor.health_counts()
             
             if total_sources > 0:
                 health_rate = (healthy_sources / total_sources) * 100
@@ -821,37 +1254,12 @@ def main():
             lines.append('---')
             lines.append('')
 
-            # 特朗普总统动态
-            lines.append('## 一、特朗普总统动态')
-            lines.append('')
-            for idx, news in enumerate(trump_news[:3], 1):
-                title = clean_ai_artifacts(sanitize_text(translate_with_gemini(model, news.get('title','')) if model else news.get('title','')))
-                summary_base = clean_ai_artifacts(sanitize_text(summarize_text(model, news.get('title',''), news.get('content',''))))
-                time_part = extract_time_iso(news.get('time',''))
-                entity_part = extract_entities(title + ' ' + (news.get('content','') or ''))
-                summary = summary_base
-                if time_part:
-                    summary = f"时间：{time_part}；" + summary
-                if entity_part:
-                    summary = f"人物/机构：{entity_part}；" + summary
-                src = format_source_link(news.get('source','未知来源'), news.get('url',''))
-                if len(title) > 80:
-                    title = title[:77] + '...'
-                lines.append(f'{idx}. **{title}**')
-                if summary:
-                    lines.append(f'摘要：{summary}')
-                lines.append(f'来源：{src}')
-                lines.append('')
-
-            lines.append('---')
-            lines.append('')
-
-            # 中美关系专题
-            lines.append('## 二、中美关系专题')
-            lines.append('')
-            for idx, news in enumerate(china_us_news[:10], 1):
-                title = clean_ai_artifacts(sanitize_text(translate_with_gemini(model, news.get('title','')) if model else news.get('title','')))
-                summary_base = clean_ai_artifacts(sanitize_text(summarize_text(model, news.get('title',''), news.get('content',''))))
+            def render_news(idx: int, news: Dict[str, Any], title_raw: str, summary_raw: str) -> List[str]:
+                title = clean_ai_artifacts(sanitize_text(title_raw))
+                summary_base = clean_ai_artifacts(sanitize_text(summary_raw))
+                # 截断回退的摘要可能长于模型摘要，统一截到 RENDERED_SUMMARY_CHARS
+                if len(summary_base) > RENDERED_SUMMARY_CHARS:
+                    summary_base = summary_base[:RENDERED_SUMMARY_CHARS - 3] + '...'
                 time_part = extract_time_iso(news.get('time',''))
                 entity_part = extract_entities(title + ' ' + (news.get('content','') or ''))
                 summary = summary_base
@@ -860,95 +1268,69 @@ def main():
                 if entity_part:
                     summary = f"人物/机构：{entity_part}；" + summary
                 src = format_source_link(news.get('source','未知来源'), news.get('url',''))
-                if len(title) > 80:
-                    title = title[:77] + '...'
-                lines.append(f'{idx}. **{title}**')
+                if len(title) > RENDERED_TITLE_CHARS:
+                    title = title[:RENDERED_TITLE_CHARS - 3] + '...'
+                item_lines = [f'{idx}. **{title}**']
                 if summary:
-                    lines.append(f'摘要：{summary}')
-                lines.append(f'来源：{src}')
-                lines.append('')
-
-            lines.append('---')
-            lines.append('')
+                    item_lines.append(f'摘要：{summary}')
+                item_lines.append(f'来源：{src}')
+                item_lines.append('')
+                return item_lines
 
-            # 俄乌冲突动态
-            lines.append('## 三、俄乌冲突动态')
-            lines.append('')
-            for idx, news in enumerate(ru_ua_news[:10], 1):
-                title = clean_ai_artifacts(sanitize_text(translate_with_gemini(model, news.get('title','')) if model else news.get('title','')))
-                summary_base = clean_ai_artifacts(sanitize_text(summarize_text(model, news.get('title',''), news.get('content',''))))
-                time_part = extract_time_iso(news.get('time',''))
-                entity_part = extract_entities(title + ' ' + (news.get('content','') or ''))
-                summary = summary_base
-                if time_part:
-                    summary = f"时间：{time_part}；" + summary
-                if entity_part:
-                    summary = f"人物/机构：{entity_part}；" + summary
-                src = format_source_link(news.get('source','未知来源'), news.get('url',''))
-                if len(title) > 80:
-                    title = title[:77] + '...'
-                lines.append(f'{idx}. **{title}**')
-                if summary:
-                    lines.append(f'摘要：{summary}')
-                lines.append(f'来源：{src}')
-                lines.append('')
+            # 预估渲染长度：标题按原文经 render_news 同样的清理与截断，摘要按上限字数占位；
+            # 无模型时摘要为正文截断，不超过正文长度（每行另加一个换行符）。译文可能略长，
+            # 拼接后再做一次整条移除的长度检查
+            def estimated_size(idx: int, news: Dict[str, Any]) -> int:
+                raw = news.get('content') or news.get('title') or ''
+                summary_chars = RENDERED_SUMMARY_CHARS if model else min(RENDERED_SUMMARY_CHARS, len(raw))
+                placeholder = '字' * summary_chars
+                return sum(len(line) + 1 for line in render_news(idx, news, news.get('title', ''), placeholder))
 
-            lines.append('---')
-            lines.append('')
-            # 关键矿产合作
-            lines.append('## 四、关键矿产合作')
-            lines.append('')
-            for idx, news in enumerate(minerals_news[:10], 1):
-                title = clean_ai_artifacts(sanitize_text(translate_with_gemini(model, news.get('title','')) if model else news.get('title','')))
-                summary_base = clean_ai_artifacts(sanitize_text(summarize_text(model, news.get('title',''), news.get('content',''))))
-                time_part = extract_time_iso(news.get('time',''))
-                entity_part = extract_entities(title + ' ' + (news.get('content','') or ''))
-                summary = summary_base
-                if time_part:
-                    summary = f"时间：{time_part}；" + summary
-                if entity_part:
-                    summary = f"人物/机构：{entity_part}；" + summary
-                src = format_source_link(news.get('source','未知来源'), news.get('url',''))
-                if len(title) > 80:
-                    title = title[:77] + '...'
-                lines.append(f'{idx}. **{title}**')
-                if summary:
-                    lines.append(f'摘要：{summary}')
-                lines.append(f'来源：{src}')
-                lines.append('')
+            sections = [
+                ('## 一、特朗普总统动态', trump_news, 3),
+                ('## 二、中美关系专题', china_us_news, 10),
+                ('## 三、俄乌冲突动态', ru_ua_news, 10),
+                ('## 四、关键矿产合作', minerals_news, 10),
+                ('## 五、虚拟货币和全球股市动态', crypto_markets_news, 10),
+            ]
+            footer = ['来源：多家权威媒体 + AI 摘要']
+            skeleton = lines + [line for heading, _, _ in sections for line in (heading, '', '---', '')] + footer
+            planned = plan_message_budget(
+                [(items, max_items) for _, items, max_items in sections],
+                estimated_size,
+                TELEGRAM_MESSAGE_LIMIT - len('\n'.join(skeleton)),
+            )
+            log(f"📐 消息预算：计划展示 {sum(len(items) for items in planned)}/{sum(min(len(items), n) for _, items, n in sections)} 条")
 
-            lines.append('---')
-            lines.append('')
+            # 只对计划展示的新闻批量翻译标题并生成摘要
+            shown = list({id(news): news for items in planned for news in items}.values())
+            rendered = {id(news): result for news, result in zip(shown, translate_and_summarize_batch(model, shown))}
 
-            # 虚拟货币和全球股市动态
-            lines.append('## 五、虚拟货币和全球股市动态')
-            lines.append('')
-            for idx, news in enumerate(crypto_markets_news[:10], 1):
-                title = clean_ai_artifacts(sanitize_text(translate_with_gemini(model, news.get('title','')) if model else news.get('title','')))
-                summary_base = clean_ai_artifacts(sanitize_text(summarize_text(model, news.get('title',''), news.get('content',''))))
-                time_part = extract_time_iso(news.get('time',''))
-                entity_part = extract_entities(title + ' ' + (news.get('content','') or ''))
-                summary = summary_base
-                if time_part:
-                    summary = f"时间：{time_part}；" + summary
-                if entity_part:
-                    summary = f"人物/机构：{entity_part}；" + summary
-                src = format_source_link(news.get('source','未知来源'), news.get('url',''))
-                if len(title) > 80:
-                    title = title[:77] + '...'
-                lines.append(f'{idx}. **{title}**')
-                if summary:
-                    lines.append(f'摘要：{summary}')
-                lines.append(f'来源：{src}')
-                lines.append('')
+            blocks = [
+                [render_news(idx, news, *rendered[id(news)]) for idx, news in enumerate(items, 1)]
+                for items in planned
+            ]
 
-            lines.append('---')
-            lines.append('')
-            lines.append('来源：多家权威媒体 + AI 摘要')
+            def assemble() -> str:
+                body = []
+                for (heading, _, _), section_blocks in zip(sections, blocks):
+                    body.append(heading)
+                    body.append('')
+                    for item_lines in section_blocks:
+                        body.extend(item_lines)
+                    body.append('---')
+                    body.append('')
+                return "\n".join(lines + body + footer)
 
-            message_text = "\n".join(lines)
-            if len(message_text) > 4000:
-                message_text = message_text[:3997] + '...'
+            # 预估可能偏小（译文标题及其中识别出的人物/机构与原文不同）：超限时从末尾整条移除，
+            # 不在条目中间截断
+            message_text = assemble()
+            while len(message_text) > TELEGRAM_MESSAGE_LIMIT and any(blocks):
+                last = max(i for i, section_blocks in enumerate(blocks) if section_blocks)
+                blocks[last].pop()
+                message_text = assemble()
+            if len(message_text) > TELEGRAM_MESSAGE_LIMIT:
+                message_text = message_text[:TELEGRAM_MESSAGE_LIMIT - 3] + '...'
             message = message_text
         else:
             message = f"""🌍 每日综合要闻简报
@@ -960,6 +1342,9 @@ def main():
 
 💡 我们正在努力恢复服务..."""
         
+        if model:
+            log(f"⏱️ Gemini 耗时: {format_timing_stats()}")
+        
         # 6. 发送消息
         success = send_telegram_message(bot_token, chat_id, message)
         
@@ -0,0 +1,184 @@
+"""
+镜像选择与对冲请求
+记录每个 Nitter/RSSHub 镜像的延迟（指数滑动平均）和成功率并持久化到 sources_health.db，
+抓取时按预期耗时排序，先请求最佳镜像，若短时间内未返回再并行请求下一个，取最先成功的结果
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# 未观测过的镜像使用的先验值
+DEFAULT_LATENCY = 3.0
+DEFAULT_SUCCESS_RATE = 0.6
+
+
+class MirrorSelector:
+    """镜像延迟/成功率统计：内存中更新，save() 时一次性写回数据库"""
+
+    def __init__(self, db_path: str = "sources_health.db", alpha: float = 0.3):
+        self.db_path = db_path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._dirty = set()
+        self.init_db()
+        self.load()
+
+    def init_db(self):
+        """初始化数据库"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS mirror_health (
+                mirror TEXT PRIMARY KEY,
+                latency REAL,
+                success_rate REAL,
+                attempts INTEGER DEFAULT 0,
+                updated_at TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def load(self):
+        """从数据库加载全部镜像统计"""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute('SELECT mirror, latency, success_rate, attempts FROM mirror_health').fetchall()
+        conn.close()
+        with self._lock:
+            for mirror, latency, success_rate, attempts in rows:
+                self._stats[mirror] = {
+                    'latency': latency if latency is not None else DEFAULT_LATENCY,
+                    'success_rate': success_rate if success_rate is not None else DEFAULT_SUCCESS_RATE,
+                    'attempts': attempts or 0,
+                }
+
+    def expected_cost(self, mirror: str) -> float:
+        """预期耗时：平均延迟 / 成功率，越小越优"""
+        stats = self._stats.get(mirror)
+        if not stats:
+            return DEFAULT_LATENCY / DEFAULT_SUCCESS_RATE
+        return stats['latency'] / max(stats['success_rate'], 0.05)
+
+    def rank(self, candidates: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """按预期耗时对 (镜像, URL) 排序；相同时保持原顺序"""
+        with self._lock:
+            return sorted(candidates, key=lambda c: self.expected_cost(c[0]))
+
+    def record(self, mirror: str, latency: float, ok: bool):
+        """记录一次请求结果"""
+        with self._lock:
+            stats = self._stats.setdefault(mirror, {
+                'latency': DEFAULT_LATENCY,
+                'success_rate': DEFAULT_SUCCESS_RATE,
+                'attempts': 0,
+            })
+            if ok:
+                stats['latency'] = (1 - self.alpha) * stats['latency'] + self.alpha * latency
+            stats['success_rate'] = (1 - self.alpha) * stats['success_rate'] + self.alpha * (1.0 if ok else 0.0)
+            stats['attempts'] += 1
+            self._dirty.add(mirror)
+
+    def save(self):
+        """将本次运行中变化的镜像统计写回数据库（单个事务）"""
+        with self._lock:
+            rows = [
+                (m, self._stats[m]['latency'], self._stats[m]['success_rate'], self._stats[m]['attempts'], datetime.now())
+                for m in self._dirty
+            ]
+            self._dirty.clear()
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO mirror_health
+                (mirror, latency, success_rate, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+        conn.close()
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='mirror-hedge')
+    return _hedge_executor
+
+
+def hedged_fetch(
+    candidates: List[Tuple[str, str]],
+    fetch: Callable[[str], Optional[T]],
+    selector: MirrorSelector,
+    *,
+    hedge_delay: float = 1.5,
+    max_in_flight: int = 2,
+    deadline: Optional[float] = None,
+) -> Optional[T]:
+    """
+    对冲请求：按顺序启动候选镜像，前一个在 hedge_delay 秒内未返回或失败即启动下一个
+
+    Args:
+        candidates: 已排序的 (镜像, URL) 列表
+        fetch: fetch(url) 返回结果，失败时返回 None 或抛出异常
+        selector: 用于记录每次请求延迟与成败
+        hedge_delay: 启动下一个镜像前的等待时间（秒）
+        max_in_flight: 同时进行的最大请求数
+        deadline: time.monotonic() 截止时刻
+
+    Returns:
+        最先成功的结果；全部失败或超时返回 None
+    """
+    executor = _get_executor()
+    pending = {}
+    queue = list(candidates)
+
+    def launch():
+        mirror, url = queue.pop(0)
+
+        def run():
+            # 从真正开始执行时计时，不把在共享线程池中排队的时间计入镜像延迟
+            started = time.monotonic()
+            try:
+                result = fetch(url)
+            except Exception:
+                result = None
+            selector.record(mirror, time.monotonic() - started, result is not None)
+            return result
+
+        pending[executor.submit(run)] = mirror
+
+    while queue or pending:
+        if queue and len(pending) < max_in_flight:
+            launch()
+        wait_for = hedge_delay if queue else None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining if wait_for is None else min(wait_for, remaining)
+        done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.pop(future)
+            result = future.result()
+            if result is not None:
+                _cancel_losers(pending)
+                return result
+    _cancel_losers(pending)
+    return None
+
+
+def _cancel_losers(pending) -> None:
+    """取消仍在共享线程池中排队的请求；已开始的请求继续在后台完成并记录统计，这里不再等待"""
+    for future in pending:
+        future.cancel()
@@ -5,10 +5,20 @@ Reddit 数据抓取模块
 """
 
 import requests
+import http_client
 import time
 import os
 import random
-from typing import List, Dict, Optional
+import threading
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import List, Dict, Optional, Iterator, Tuple
+
+
+TOKEN_CACHE_FILE = "reddit_token.json"
+
+# 全局 Reddit 限速器：每个主机每秒最多约 2 次请求（与原先 0.5 秒间隔一致）
+_rate_limiter = http_client.HostRateLimiter(min_interval=0.5)
 
 
 def get_reddit_headers() -> Dict[str, str]:
@@ -25,7 +35,7 @@ def get_reddit_headers() -> Dict[str, str]:
         'User-Agent': random.choice(user_agents),
         'Accept': 'application/json, text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept-Encoding': http_client.ACCEPT_ENCODING,
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1',
         'Sec-Fetch-Dest': 'document',
@@ -35,8 +45,8 @@ def get_reddit_headers() -> Dict[str, str]:
     }
 
 
-def get_reddit_oauth_token() -> Optional[str]:
-    """获取 Reddit OAuth token（如果配置了）"""
+def _request_reddit_oauth_token() -> Optional[Dict]:
+    """向 Reddit 申请新的 OAuth token，返回原始 token 数据（未配置或失败时返回 None）"""
     client_id = os.getenv('REDDIT_CLIENT_ID')
     client_secret = os.getenv('REDDIT_CLIENT_SECRET')
     
@@ -50,7 +60,7 @@ def get_reddit_oauth_token() -> Optional[str]:
             'device_id': 'DO_NOT_TRACK_THIS_DEVICE'
         }
         
-        auth_response = requests.post(
+        auth_response = http_client.post(
             auth_url,
             data=auth_data,
             auth=(client_id, client_secret),
@@ -60,13 +70,120 @@ def get_reddit_oauth_token() -> Optional[str]:
         
         if auth_response.status_code == 200:
             token_data = auth_response.json()
-            return token_data.get('access_token')
+            if token_data.get('access_token'):
+                return token_data
     except Exception as e:
         print(f"⚠️ OAuth 认证失败: {e}")
     
     return None
 
 
+class RedditTokenManager:
+    """
+    Reddit OAuth token 管理器
+    在内存和磁盘上缓存 token 及其过期时间，提前刷新，避免每个板块都重新认证
+    """
+
+    def __init__(self, cache_file: str = TOKEN_CACHE_FILE, refresh_margin: int = 300):
+        self.cache_file = cache_file
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at: float = 0.0
+        self._client_id: Optional[str] = None
+
+    def _is_fresh(self) -> bool:
+        return bool(self._token) and time.time() < self._expires_at - self.refresh_margin
+
+    def _load_from_disk(self) -> None:
+        try:
+            if not os.path.exists(self.cache_file):
+                return
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # 更换了 client_id 时不复用旧 token
+            if data.get('client_id') != self._client_id:
+                return
+            self._token = data.get('access_token')
+            self._expires_at = float(data.get('expires_at', 0))
+        except Exception:
+            self._token, self._expires_at = None, 0.0
+
+    def _save_to_disk(self) -> None:
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'client_id': self._client_id,
+                    'access_token': self._token,
+                    'expires_at': self._expires_at,
+                }, f)
+        except Exception:
+            pass
+
+    def get_token(self, force_refresh: bool = False, stale_token: Optional[str] = None) -> Optional[str]:
+        """
+        获取可用的 OAuth token
+        
+        Args:
+            force_refresh: 强制重新申请（例如收到 403 时）
+            stale_token: 调用方被拒绝的旧 token；若其他线程已换成新的有效 token，
+                直接返回新 token 而不重复申请
+        
+        Returns:
+            token 字符串；未配置 OAuth 或申请失败时返回 None
+        """
+        with self._lock:
+            client_id = os.getenv('REDDIT_CLIENT_ID')
+            if not client_id or not os.getenv('REDDIT_CLIENT_SECRET'):
+                return None
+            if client_id != self._client_id:
+                self._client_id = client_id
+                self._token, self._expires_at = None, 0.0
+
+            if force_refresh and stale_token and self._token != stale_token and self._is_fresh():
+                return self._token
+            if not force_refresh:
+                if self._is_fresh():
+                    return self._token
+                self._load_from_disk()
+                if self._is_fresh():
+                    return self._token
+
+            token_data = _request_reddit_oauth_token()
+            if not token_data:
+                self._token, self._expires_at = None, 0.0
+                return None
+            self._token = token_data['access_token']
+            self._expires_at = time.time() + float(token_data.get('expires_in', 3600))
+            self._save_to_disk()
+            return self._token
+
+    def invalidate(self, stale_token: Optional[str] = None) -> None:
+        """
+        丢弃当前 token（内存与磁盘）
+
+        Args:
+            stale_token: 仅当当前 token 仍是它（或已为空）时才丢弃，避免误删其他线程刚换上的新 token
+        """
+        with self._lock:
+            if stale_token and self._token and self._token != stale_token:
+                return
+            self._token, self._expires_at = None, 0.0
+            try:
+                if os.path.exists(self.cache_file):
+                    os.remove(self.cache_file)
+            except Exception:
+                pass
+
+
+_token_manager = RedditTokenManager()
+
+
+def get_reddit_oauth_token(force_refresh: bool = False, stale_token: Optional[str] = None) -> Optional[str]:
+    """获取 Reddit OAuth token（如果配置了），优先使用缓存"""
+    return _token_manager.get_token(force_refresh=force_refresh, stale_token=stale_token)
+
+
 def fetch_subreddit_posts(subreddit: str, limit: int = 10, sort: str = 'top', time_period: str = 'day') -> List[Dict]:
     """
     从指定 Reddit 板块获取帖子
@@ -103,6 +220,7 @@ def fetch_subreddit_posts(subreddit: str, limit: int = 10, sort: str = 'top', ti
     
     # 重试机制
     max_retries = 3
+    response = None
     for attempt in range(max_retries):
         try:
             print(f"正在获取 r/{subreddit} 的 {sort} 帖子... (尝试 {attempt + 1}/{max_retries})")
@@ -113,16 +231,20 @@ def fetch_subreddit_posts(subreddit: str, limit: int = 10, sort: str = 'top', ti
                 print(f"⏳ 等待 {delay:.1f} 秒后重试...")
                 time.sleep(delay)
             
-            response = requests.get(url, params=params, headers=headers, timeout=15)
+            _rate_limiter.wait(url)
+            response = http_client.get(url, params=params, headers=headers, timeout=15)
             
             if response.status_code == 403:
                 print(f"❌ Reddit 403 错误: 可能被限制访问")
                 if oauth_token:
                     print("🔄 OAuth token 可能已过期，尝试重新获取...")
-                    oauth_token = get_reddit_oauth_token()
+                    stale_token = oauth_token
+                    oauth_token = get_reddit_oauth_token(force_refresh=True, stale_token=stale_token)
                     if oauth_token:
                         headers['Authorization'] = f'bearer {oauth_token}'
                         continue
+                    # 重新申请失败：连同磁盘缓存一起丢弃，下次运行不再复用被拒绝的 token
+                    _token_manager.invalidate(stale_token=stale_token)
                 else:
                     print("💡 建议配置 REDDIT_CLIENT_ID 和 REDDIT_CLIENT_SECRET 使用 OAuth")
                 break
@@ -149,8 +271,9 @@ def fetch_subreddit_posts(subreddit: str, limit: int = 10, sort: str = 'top', ti
                 break
             continue
     
-    if response.status_code != 200:
-        print(f"❌ 获取 r/{subreddit} 失败: HTTP {response.status_code}")
+    if response is None or response.status_code != 200:
+        status = response.status_code if response is not None else 'N/A'
+        print(f"❌ 获取 r/{subreddit} 失败: HTTP {status}")
         return []
     
     try:
@@ -185,36 +308,91 @@ def fetch_subreddit_posts(subreddit: str, limit: int = 10, sort: str = 'top', ti
         return []
 
 
+def iter_subreddits_concurrently(
+    subreddits: List[str],
+    posts_per_subreddit: int = 2,
+    *,
+    sort: str = 'top',
+    time_period: str = 'day',
+    max_workers: int = 4,
+    deadline: float = 60.0,
+) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    并发抓取多个 Reddit 板块，按完成先后顺序产出结果
+    
+    Args:
+        subreddits: 板块名称列表
+        posts_per_subreddit: 每个板块获取的帖子数量
+        max_workers: 最大并发数
+        deadline: 整批抓取的总时限（秒），超时后不再等待未完成的板块（其请求仍在后台
+            按单次请求超时结束）
+    
+    Yields:
+        (板块名称, 帖子列表)
+    """
+    if not subreddits:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(subreddits))))
+    futures = {
+        executor.submit(
+            fetch_subreddit_posts,
+            subreddit,
+            limit=posts_per_subreddit,
+            sort=sort,
+            time_period=time_period,
+        ): subreddit
+        for subreddit in subreddits
+    }
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            subreddit = futures[future]
+            try:
+                yield subreddit, future.result()
+            except Exception as e:
+                print(f"❌ 获取 r/{subreddit} 时发生错误: {e}")
+                yield subreddit, []
+    except FuturesTimeoutError:
+        pending = [futures[f] for f in futures if not f.done()]
+        print(f"⏰ Reddit 抓取超过总时限 {deadline:.0f} 秒，放弃: {', '.join(pending)}")
+    finally:
+        # 不等待仍在进行的请求，未开始的任务直接取消；进行中的请求由单次请求超时（15 秒）与
+        # 重试次数兜底结束（线程池工作线程不是守护线程，解释器退出时仍会等待它们）
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def fetch_multiple_subreddits(
     subreddits: List[str],
     posts_per_subreddit: int = 2,
     *,
     sort: str = 'top',
     time_period: str = 'day',
+    max_workers: int = 4,
+    deadline: float = 60.0,
 ) -> List[Dict]:
     """
-    从多个 Reddit 板块获取帖子
+    从多个 Reddit 板块获取帖子（并发抓取，按主机限速）
     
     Args:
         subreddits: 板块名称列表
         posts_per_subreddit: 每个板块获取的帖子数量
+        max_workers: 最大并发数
+        deadline: 整批抓取的总时限（秒）
     
     Returns:
         所有帖子的合并列表
     """
     all_posts = []
     
-    for subreddit in subreddits:
-        posts = fetch_subreddit_posts(
-            subreddit,
-            limit=posts_per_subreddit,
-            sort=sort,
-            time_period=time_period,
-        )
+    for _, posts in iter_subreddits_concurrently(
+        subreddits,
+        posts_per_subreddit,
+        sort=sort,
+        time_period=time_period,
+        max_workers=max_workers,
+        deadline=deadline,
+    ):
         all_posts.extend(posts)
-        
-        # 添加延迟避免被限流
-        time.sleep(0.5)
     
     # 按评分排序
     all_posts.sort(key=lambda x: x['score'], reverse=True)
@@ -5,35 +5,11 @@
 - Nitter 镜像 RSS (可选,稳定性较差)
 """
 
-import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime
-from email.utils import parsedate_to_datetime
+import http_client
+from feed_parser import stream_feed_items
 from typing import List, Dict, Optional
 
 
-def _parse_datetime_to_utc_ts(text: str) -> int:
-    """将 RSS 日期字符串解析为 UTC 时间戳"""
-    try:
-        # 优先使用 RFC822
-        dt = None
-        try:
-            dt = parsedate_to_datetime(text)
-        except Exception:
-            dt = None
-        if dt is None:
-            # 尝试 ISO 格式
-            try:
-                dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
-            except Exception:
-                return 0
-        if dt.tzinfo:
-            dt = dt.astimezone(tz=None).replace(tzinfo=None)
-        return int(dt.timestamp())
-    except Exception:
-        return 0
-
-
 def fetch_youtube_rss(channel_id: str, limit: int = 5) -> List[Dict]:
     """
     拉取 YouTube 频道 RSS 最近发布的视频
@@ -49,28 +25,16 @@ def fetch_youtube_rss(channel_id: str, limit: int = 5) -> List[Dict]:
         'Accept': 'application/rss+xml, application/xml, text/xml, */*',
     }
     try:
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code != 200:
+        # 流式解析 Atom feed，取够 limit 条即停止读取
+        entries = stream_feed_items(url, limit=limit, headers=headers, timeout=10)
+        if entries is None:
             return []
-        root = ET.fromstring(r.text)
-        # Atom feed namespace
-        ns = {
-            'atom': 'http://www.w3.org/2005/Atom',
-            'yt': 'http://www.youtube.com/xml/schemas/2015',
-            'media': 'http://search.yahoo.com/mrss/'
-        }
-        entries = root.findall('atom:entry', ns)
         posts: List[Dict] = []
-        for e in entries[:limit]:
-            title_elem = e.find('atom:title', ns)
-            link_elem = e.find('atom:link', ns)
-            updated_elem = e.find('atom:updated', ns)
-            author_elem = e.find('atom:author/atom:name', ns)
-
-            title = title_elem.text if title_elem is not None else ''
-            link = link_elem.get('href') if link_elem is not None else ''
-            created_ts = _parse_datetime_to_utc_ts(updated_elem.text) if updated_elem is not None else 0
-            author = author_elem.text if author_elem is not None else 'YouTube'
+        for e in entries:
+            title = e['title'] or ''
+            link = e['link'] or ''
+            created_ts = e['published_ts']
+            author = e['author'] or 'YouTube'
 
             posts.append({
                 'title': title,
@@ -109,7 +73,7 @@ def resolve_youtube_channel_id_from_url_or_handle(url_or_handle: str) -> Optiona
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Safari/537.36'
         }
-        r = requests.get(target, headers=headers, timeout=10)
+        r = http_client.get(target, headers=headers, timeout=10)
         if r.status_code != 200:
             return None
         html = r.text
@@ -138,19 +102,14 @@ def fetch_nitter_rss(username: str, limit: int = 5) -> List[Dict]:
         'Accept': 'application/rss+xml, application/xml, text/xml, */*',
     }
     try:
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code != 200:
+        items = stream_feed_items(url, limit=limit, headers=headers, timeout=10)
+        if items is None:
             return []
-        root = ET.fromstring(r.text)
-        items = root.findall('.//item')
         posts: List[Dict] = []
-        for it in items[:limit]:
-            title_elem = it.find('title')
-            link_elem = it.find('link')
-            pub_elem = it.find('pubDate')
-            title = title_elem.text if title_elem is not None else ''
-            link = link_elem.text if link_elem is not None else ''
-            created_ts = _parse_datetime_to_utc_ts(pub_elem.text) if pub_elem is not None else 0
+        for it in items:
+            title = it['title'] or ''
+            link = it['link'] or ''
+            created_ts = it['published_ts']
             posts.append({
                 'title': title,
                 'url': link,
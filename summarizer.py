@@ -1,13 +1,134 @@
 """
 文本摘要模块
-支持使用 Gemini API 生成摘要,如果不可用则使用简单文本截断
+支持三种后端（SUMMARY_BACKEND）：gemini（Gemini API）、extractive（本地 TextRank 抽取式摘要）、
+truncate（简单文本截断）；Gemini 不可用或调用失败时回退到抽取式摘要
 """
 
+import json
 import os
-from typing import Optional
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 
+from extractive_summarizer import extractive_summary
+from summary_cache import get_summary_cache
 
-def summarize_post(title: str, text: str, api_key: Optional[str] = None) -> str:
+SUMMARY_MODEL = 'gemini-2.5-flash'
+SUMMARY_BACKENDS = ('gemini', 'extractive', 'truncate')
+DEFAULT_SUMMARY_BACKEND = 'gemini'
+# 修改提示词时同步修改版本号，使旧缓存失效
+SUMMARY_PROMPT_VERSION = 'summarize_post:v1'
+
+# Gemini 模型实例注册表：每个 (API 密钥, 模型名) 在进程内只配置并创建一次
+_model_registry: Dict[Tuple[str, str], Any] = {}
+_registry_lock = threading.Lock()
+
+# 耗时统计：setup 为 SDK 导入/配置/建模型，inference 为 generate_content 调用
+_timings = {'setup': 0.0, 'setup_calls': 0, 'inference': 0.0, 'inference_calls': 0}
+_timings_lock = threading.Lock()
+
+
+def _record_timing(stage: str, seconds: float):
+    with _timings_lock:
+        _timings[stage] += seconds
+        _timings[f"{stage}_calls"] += 1
+
+
+def get_gemini_model(api_key: str, model_name: str = SUMMARY_MODEL):
+    """
+    获取共享的 Gemini 模型实例，首次调用时导入 SDK 并完成配置
+
+    Raises:
+        ImportError: 未安装 google-generativeai
+    """
+    key = (api_key, model_name)
+    with _registry_lock:
+        model = _model_registry.get(key)
+        if model is None:
+            start = time.perf_counter()
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(model_name)
+            _record_timing('setup', time.perf_counter() - start)
+            _model_registry[key] = model
+    return model
+
+
+def generate_content(model, prompt: str):
+    """调用模型生成内容，并计入推理耗时"""
+    start = time.perf_counter()
+    try:
+        return model.generate_content(prompt)
+    finally:
+        _record_timing('inference', time.perf_counter() - start)
+
+
+def parse_json_object(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """从模型输出中解析 JSON 对象（容忍 ```json 代码块与前后多余文字）；失败返回 None"""
+    if not text:
+        return None
+    match = re.search(r'\{.*\}', text, re.S)
+    if not match:
+        return None
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def generate_json_batch(model, blocks: Dict[str, str], instructions: str) -> Dict[str, Any]:
+    """
+    将多条内容打包进一次模型调用，要求输出以条目编号为键的 JSON 对象
+
+    Args:
+        model: Gemini 模型实例
+        blocks: 条目编号 -> 条目正文
+        instructions: 任务说明（需说明输出格式）
+
+    Returns:
+        编号 -> 模型输出；调用或解析失败时返回空字典，由调用方逐条回退
+    """
+    if not blocks:
+        return {}
+    prompt = instructions + "\n\n" + "\n\n".join(f"[{key}]\n{body}" for key, body in blocks.items())
+    try:
+        response = generate_content(model, prompt)
+        # 候选被拦截或为空时读取 .text 会抛出 ValueError
+        text = response.text
+    except Exception as e:
+        print(f"Gemini 批量调用失败: {e}")
+        return {}
+    return parse_json_object(text) or {}
+
+
+def get_timing_stats() -> Dict[str, float]:
+    """返回耗时统计副本"""
+    with _timings_lock:
+        return dict(_timings)
+
+
+def format_timing_stats() -> str:
+    """格式化耗时统计：初始化 vs 推理"""
+    stats = get_timing_stats()
+    avg = stats['inference'] / stats['inference_calls'] if stats['inference_calls'] else 0.0
+    return (
+        f"初始化 {stats['setup']:.2f}s（{stats['setup_calls']} 次），"
+        f"推理 {stats['inference']:.2f}s（{stats['inference_calls']} 次，平均 {avg:.2f}s）"
+    )
+
+
+def get_summary_backend() -> str:
+    """当前摘要后端：调用时读取 SUMMARY_BACKEND（.env 加载之后同样生效），未知取值回退到 gemini"""
+    backend = (os.getenv('SUMMARY_BACKEND') or DEFAULT_SUMMARY_BACKEND).strip().lower()
+    if backend not in SUMMARY_BACKENDS:
+        print(f"未知的摘要后端 {backend}，使用 {DEFAULT_SUMMARY_BACKEND}")
+        return DEFAULT_SUMMARY_BACKEND
+    return backend
+
+
+def summarize_post(title: str, text: str, api_key: Optional[str] = None, backend: Optional[str] = None) -> str:
     """
     为帖子生成摘要
     
@@ -15,18 +136,42 @@ def summarize_post(title: str, text: str, api_key: Optional[str] = None) -> str:
         title: 帖子标题
         text: 帖子内容
         api_key: Gemini API 密钥 (可选)
+        backend: 摘要后端，取值见 SUMMARY_BACKENDS，缺省使用 get_summary_backend()；
+            gemini 后端未提供 API 密钥时使用抽取式摘要
     
     Returns:
         摘要文本
     """
-    if api_key and api_key.strip():
+    backend = backend.lower() if backend else get_summary_backend()
+    if backend not in SUMMARY_BACKENDS:
+        print(f"未知的摘要后端 {backend}，使用 {DEFAULT_SUMMARY_BACKEND}")
+        backend = DEFAULT_SUMMARY_BACKEND
+    if backend == 'truncate':
+        return truncate_text(title, text)
+    
+    if backend == 'gemini' and api_key and api_key.strip():
         try:
             return summarize_with_gemini(title, text, api_key)
         except Exception as e:
             print(f"Gemini API 摘要失败: {e}")
-            print("回退到文本截断模式")
+            print("回退到抽取式摘要")
+    
+    return summarize_extractive(title, text)
+
+
+def summarize_extractive(title: str, text: str, max_length: int = 150) -> str:
+    """
+    本地抽取式摘要（TextRank），不调用模型；内容为空时与 truncate_text 相同
     
-    return truncate_text(title, text)
+    Args:
+        title: 帖子标题
+        text: 帖子内容
+        max_length: 最大长度
+    
+    Returns:
+        由原文句子组成的摘要
+    """
+    return extractive_summary(text, max_length=max_length) or truncate_text(title, text, max_length)
 
 
 def summarize_with_gemini(title: str, text: str, api_key: str) -> str:
@@ -42,14 +187,39 @@ def summarize_with_gemini(title: str, text: str, api_key: str) -> str:
         Gemini 生成的摘要
     """
     try:
-        import google.generativeai as genai
+        # 相同标题与内容已生成过摘要时直接复用
+        summary = get_summary_cache().memoize(
+            SUMMARY_PROMPT_VERSION,
+            SUMMARY_MODEL,
+            f"{title}\n{text[:1000]}",
+            lambda: _generate_summary(title, text, api_key),
+        )
         
-        # 配置 Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        # 确保摘要不为空
+        if not summary:
+            return summarize_extractive(title, text)
+        
+        return summary
         
-        # 构建智能提示词
-        prompt = f"""
+    except ImportError:
+        print("google-generativeai 库未安装,回退到抽取式摘要")
+        return summarize_extractive(title, text)
+    except Exception as e:
+        print(f"Gemini API 调用失败: {e}")
+        return summarize_extractive(title, text)
+
+
+def estimate_summary_tokens(post: Dict[str, Any]) -> int:
+    """粗略估算 summarize_post 单次调用的 token 数：提示词约 3 字符/token，加上输出预留"""
+    return (len(post.get('title') or '') + min(len(post.get('selftext') or ''), 1000) + 400) // 3 + 300
+
+
+def _generate_summary(title: str, text: str, api_key: str) -> str:
+    """调用 Gemini 生成摘要，返回去除首尾空白的模型输出"""
+    model = get_gemini_model(api_key)
+    
+    # 构建智能提示词
+    prompt = f"""
 你是一位专业的新闻编辑，请为以下内容生成高质量的中文摘要：
 
 标题: {title}
@@ -68,22 +238,9 @@ def summarize_with_gemini(title: str, text: str, api_key: str) -> str:
 
 请直接输出摘要，不要任何前缀或后缀。
 """
-        
-        response = model.generate_content(prompt)
-        summary = response.text.strip()
-        
-        # 确保摘要不为空
-        if not summary:
-            return truncate_text(title, text)
-        
-        return summary
-        
-    except ImportError:
-        print("google-generativeai 库未安装,回退到文本截断模式")
-        return truncate_text(title, text)
-    except Exception as e:
-        print(f"Gemini API 调用失败: {e}")
-        return truncate_text(title, text)
+    
+    response = generate_content(model, prompt)
+    return response.text.strip()
 
 
 def truncate_text(title: str, text: str, max_length: int = 150) -> str:
@@ -145,6 +302,9 @@ if __name__ == "__main__":
     truncated = truncate_text(test_title, test_text)
     print(f"截断结果: {truncated}")
     
+    print("\n测试抽取式摘要:")
+    print(f"抽取结果: {summarize_extractive(test_title, test_text)}")
+    
     print("\n测试格式化:")
     formatted = format_summary_for_telegram(truncated)
     print(f"格式化结果: {formatted}")
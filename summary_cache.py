@@ -0,0 +1,127 @@
+"""
+摘要/翻译结果缓存
+以 (提示词模板版本, 模型, 规范化文本哈希) 为键持久化模型输出，相同内容再次出现时直接复用，
+不再调用模型；记录按 TTL 过期，并按最近使用时间淘汰超出容量的旧记录
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from env_config import env_float, env_int
+
+# 默认有效期（小时）与容量；SUMMARY_CACHE_TTL_HOURS / SUMMARY_CACHE_MAX_ENTRIES 在创建缓存时读取
+DEFAULT_TTL_HOURS = 72.0
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """规范化文本：合并连续空白并去掉首尾空白"""
+    return ' '.join((text or '').split())
+
+
+def make_key(template_version: str, model: str, text: Optional[str]) -> str:
+    """缓存键：模板版本、模型与规范化文本共同哈希"""
+    payload = '\x1f'.join((template_version, model, normalize_text(text)))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SummaryCache:
+    """模型输出缓存：单个长连接（WAL 模式），可在多个线程间共享"""
+
+    def __init__(self, db_path: str = "summary_cache.db", ttl_hours: Optional[float] = None, max_entries: Optional[int] = None):
+        if ttl_hours is None:
+            ttl_hours = env_float('SUMMARY_CACHE_TTL_HOURS', DEFAULT_TTL_HOURS)
+        if max_entries is None:
+            max_entries = env_int('SUMMARY_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.init_db()
+        self.evict()
+
+    def init_db(self):
+        """初始化数据库"""
+        with self._lock, self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    template TEXT,
+                    model TEXT,
+                    result TEXT,
+                    created_at REAL,
+                    last_used REAL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_summary_last_used ON summary_cache(last_used)')
+
+    def get(self, template_version: str, model: str, text: Optional[str]) -> Optional[str]:
+        """读取未过期的缓存结果并刷新最近使用时间；未命中返回 None"""
+        key = make_key(template_version, model, text)
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                'SELECT result FROM summary_cache WHERE cache_key = ? AND created_at >= ?',
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row:
+                self.conn.execute('UPDATE summary_cache SET last_used = ? WHERE cache_key = ?', (now, key))
+        return row[0] if row else None
+
+    def put(self, template_version: str, model: str, text: Optional[str], result: str):
+        """保存模型输出"""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO summary_cache
+                (cache_key, template, model, result, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (make_key(template_version, model, text), template_version, model, result, now, now))
+
+    def evict(self):
+        """删除过期记录，并按最近使用时间淘汰超出 max_entries 的记录"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM summary_cache WHERE created_at < ?', (time.time() - self.ttl_seconds,))
+            self.conn.execute('''
+                DELETE FROM summary_cache WHERE cache_key IN (
+                    SELECT cache_key FROM summary_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+
+    def memoize(self, template_version: str, model: str, text: Optional[str], compute: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        先查缓存，未命中时调用 compute 并缓存其结果
+
+        compute 返回 None 或空串表示调用失败（如回退到截断），此时不写入缓存
+        """
+        cached = self.get(template_version, model, text)
+        if cached is not None:
+            return cached
+        result = compute()
+        if result:
+            self.put(template_version, model, text, result)
+        return result
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self.conn.close()
+
+
+_default_cache: Optional[SummaryCache] = None
+_default_lock = threading.Lock()
+
+
+def get_summary_cache() -> SummaryCache:
+    """获取默认的 SummaryCache 实例"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SummaryCache()
+    return _default_cache
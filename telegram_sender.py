@@ -4,6 +4,7 @@ Telegram 消息发送模块
 """
 
 import requests
+import http_client
 import time
 from typing import Optional
 from datetime import datetime, timedelta
@@ -40,7 +41,7 @@ def send_message(bot_token: str, chat_id: str, text: str, parse_mode: str = 'Mar
         print("正在发送 Telegram 消息...")
         print(f"消息长度: {len(text)} 字符")
         
-        response = requests.post(url, json=payload, timeout=30)
+        response = http_client.post(url, json=payload, timeout=30)
         
         # 打印响应状态
         print(f"HTTP 状态码: {response.status_code}")
@@ -119,7 +120,7 @@ def validate_telegram_config(bot_token: str, chat_id: str) -> bool:
             'parse_mode': 'Markdown'
         }
         
-        response = requests.post(url, json=payload, timeout=10)
+        response = http_client.post(url, json=payload, timeout=10)
         response.raise_for_status()
         
         result = response.json()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+布隆过滤器测试：成员判断、保存/加载往返与损坏文件的处理
+"""
+
+import json
+import os
+import struct
+import tempfile
+
+from bloom_filter import MAGIC, BloomFilter
+
+
+def write_raw(path, header, bits=b''):
+    payload = header if isinstance(header, bytes) else json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(payload)))
+        f.write(payload)
+        f.write(bits)
+
+
+def test_membership():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"url:https://example.com/{i}" for i in range(1000)]
+    bloom.update(keys)
+    assert all(k in bloom for k in keys)
+    false_positives = sum(f"fp:{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_save_load_round_trip():
+    bloom = BloomFilter(200, 0.01)
+    bloom.update(['a', 'b', 'c'])
+    bloom.meta = {'built_at': 1700000000, 'rows': 3}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bloom.bin')
+        bloom.save(path)
+        loaded = BloomFilter.load(path)
+    assert loaded is not None
+    assert loaded.bits == bloom.bits
+    assert loaded.num_hashes == bloom.num_hashes
+    assert loaded.count == 3
+    assert loaded.meta == bloom.meta
+    assert 'a' in loaded and 'z' not in loaded
+
+
+def test_load_invalid_files_returns_none():
+    valid = BloomFilter(100)
+    header = {
+        'capacity': valid.capacity, 'error_rate': valid.error_rate, 'num_bits': valid.num_bits,
+        'num_hashes': valid.num_hashes, 'count': 0, 'meta': {},
+    }
+    cases = {
+        'missing_key': ({k: v for k, v in header.items() if k != 'num_bits'}, bytes(valid.bits)),
+        'list_header': (b'[1, 2, 3]', bytes(valid.bits)),
+        'string_header': (b'"bloom"', bytes(valid.bits)),
+        'bad_json': (b'{not json', bytes(valid.bits)),
+        'wrong_size': (header, bytes(valid.bits)[:-1]),
+        'bad_meta': (dict(header, meta=[1]), bytes(valid.bits)),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        assert BloomFilter.load(os.path.join(tmp, 'missing.bin')) is None
+        for name, (case_header, bits) in cases.items():
+            path = os.path.join(tmp, f"{name}.bin")
+            write_raw(path, case_header, bits)
+            assert BloomFilter.load(path) is None, name
+        path = os.path.join(tmp, 'bad_magic.bin')
+        with open(path, 'wb') as f:
+            f.write(b'XXXX')
+        assert BloomFilter.load(path) is None
+        path = os.path.join(tmp, 'truncated.bin')
+        with open(path, 'wb') as f:
+            f.write(MAGIC + b'\x01')
+        assert BloomFilter.load(path) is None
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+去重测试：URL 规范化、标题指纹、去重键与近似重复聚类
+"""
+
+from dedup import canonicalize_url, cluster_near_duplicates, content_fingerprint, dedup_keys, near_duplicate_text
+
+
+def test_canonicalize_url_variants():
+    expected = 'https://example.com/news/story?id=42'
+    for url in [
+        'https://example.com/news/story?id=42',
+        'http://www.example.com/news/story/?id=42',
+        'https://m.example.com/news/story?id=42&utm_source=twitter&utm_medium=social',
+        'https://EXAMPLE.com:443/news/story?fbclid=abc&id=42#comments',
+    ]:
+        assert canonicalize_url(url) == expected, url
+
+
+def test_canonicalize_url_keeps_content_params():
+    # 参数排序，非跟踪参数保留；s / t 只在特定站点上视为跟踪参数
+    assert canonicalize_url('https://example.com/a?b=2&a=1') == 'https://example.com/a?a=1&b=2'
+    assert canonicalize_url('https://example.com/watch?t=120') == 'https://example.com/watch?t=120'
+    assert canonicalize_url('https://twitter.com/user/status/1?s=20&t=abc') == 'https://twitter.com/user/status/1'
+    assert canonicalize_url('https://www.youtube.com/watch?v=xyz&si=share') == 'https://youtube.com/watch?v=xyz'
+
+
+def test_canonicalize_url_edge_cases():
+    assert canonicalize_url(None) == ''
+    assert canonicalize_url('') == ''
+    assert canonicalize_url('not a url') == 'not a url'
+    assert canonicalize_url('https://example.com') == 'https://example.com/'
+    assert canonicalize_url('https://example.com:8080/x') == 'https://example.com:8080/x'
+
+
+def test_content_fingerprint():
+    a = content_fingerprint('The US Imposes New Tariffs on China!')
+    assert a == content_fingerprint('us imposes new tariffs on china')
+    assert a != content_fingerprint('China imposes new tariffs on US')
+    assert content_fingerprint('') == ''
+    assert content_fingerprint('The of a') == ''
+
+
+def test_dedup_keys():
+    keys = dedup_keys({'url': 'http://www.example.com/x?utm_campaign=y', 'title': 'Hello World'})
+    assert keys == ["url:https://example.com/x", f"fp:{content_fingerprint('Hello World')}"]
+    assert dedup_keys({'url': '', 'title': ''}) == []
+    assert dedup_keys({'title': 'Only Title'}) == [f"fp:{content_fingerprint('Only Title')}"]
+
+
+def test_cluster_near_duplicates_groups_reposts():
+    body = 'The commerce department widened export controls on chip making tools on Thursday, adding etch and deposition equipment'
+    items = [
+        {'title': 'US widens chip tool export controls', 'content': body, 'source': 'A', 'url': 'https://a.example/1', 'weight': 1.0},
+        {'title': 'US widens chip-tool export controls', 'content': body + ' officials said', 'source': 'B', 'url': 'https://b.example/1', 'weight': 2.0},
+        {'title': 'Bitcoin climbs past record as ETF inflows continue', 'content': 'Crypto markets rallied', 'source': 'C', 'url': 'https://c.example/1', 'weight': 1.0},
+    ]
+    reps = cluster_near_duplicates(items, text_of=near_duplicate_text, weight_of=lambda item: item['weight'])
+    assert [item['source'] for item in reps] == ['B', 'C']
+    assert reps[0]['cluster_size'] == 2
+    assert items[0]['duplicate_of'] == 'https://b.example/1'
+    assert reps[1]['cluster_size'] == 1
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
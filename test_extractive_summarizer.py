@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+抽取式摘要测试：分句、长度上限以及纯 Python 与 NumPy 实现结果一致
+"""
+
+from extractive_summarizer import extractive_summary, np, split_sentences, textrank_scores
+
+TEXT = (
+    "The Commerce Department widened export controls on chip making tools. "
+    "The rule adds etch and deposition tools used for advanced chips to the control list. "
+    "Officials said the export controls on chip tools take effect in thirty days. "
+    "Separately, the weather in Washington was mild.\n"
+    "中国商务部表示坚决反对。商务部称将采取必要措施维护企业权益！"
+)
+
+
+def test_split_sentences():
+    sentences = split_sentences(TEXT)
+    assert sentences[0] == 'The Commerce Department widened export controls on chip making tools.'
+    assert sentences[-2:] == ['中国商务部表示坚决反对。', '商务部称将采取必要措施维护企业权益！']
+    assert split_sentences('') == []
+    assert split_sentences(None) == []
+
+
+def test_summary_respects_max_length():
+    for max_length in (40, 80, 150, 400):
+        summary = extractive_summary(TEXT, max_length=max_length)
+        assert summary and len(summary) <= max_length, max_length
+
+
+def test_summary_keeps_original_order_and_skips_outlier():
+    summary = extractive_summary(TEXT, max_length=200, use_numpy=False)
+    sentences = [s for s in split_sentences(TEXT) if s in summary]
+    positions = [summary.index(s) for s in sentences]
+    assert positions == sorted(positions)
+    assert 'weather' not in summary
+
+
+def test_empty_and_single_sentence():
+    assert extractive_summary('') == ''
+    assert extractive_summary('Only one sentence here.') == 'Only one sentence here.'
+
+
+def test_numpy_and_python_scores_match():
+    if np is None:
+        return
+    sentences = split_sentences(TEXT)
+    python_scores = textrank_scores(sentences, use_numpy=False)
+    numpy_scores = textrank_scores(sentences, use_numpy=True)
+    assert all(abs(a - b) < 1e-4 for a, b in zip(python_scores, numpy_scores))
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+feed 解析测试：RSS 2.0 / Atom / RDF 样本字段提取与达到条数后提前停止读取
+"""
+
+import glob
+import os
+
+from feed_parser import iter_feed_items, parse_date, parse_feed
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def test_rss2_cdata_and_entities():
+    items = parse_feed(read_fixture('rss2_wordpress_policy.xml'))
+    assert len(items) == 5
+    first = items[0]
+    assert first['title'] == 'What the New Export Rules Mean for Advanced Chip Tools'
+    assert first['link'] == 'https://tradesecurity.example.org/2025/10/02/export-rules-chip-tools/'
+    assert first['author'] == 'Maria Delgado'
+    assert first['description'].startswith('<p>The Commerce Department&#8217;s')
+    assert first['published_ts'] == parse_date('Thu, 02 Oct 2025 14:05:12 +0000')
+    assert items[2]['title'] == 'Senate Panel Advances Tariff Review Bill — With Changes'
+
+
+def test_atom_links_and_authors():
+    items = parse_feed(read_fixture('atom_youtube_channel.xml'))
+    assert len(items) == 4
+    assert items[0]['title'] == 'Tariffs, Chips & Rare Earths: What Changed This Week'
+    assert items[0]['link'] == 'https://www.youtube.com/watch?v=Qm3vT8kLpXa'
+    assert items[0]['author'] == 'Policy Brief Daily'
+    assert items[0]['published_ts'] == parse_date('2025-10-02T13:00:21+00:00')
+
+
+def test_rdf_dc_date():
+    items = parse_feed(read_fixture('rdf_dc_agency.xml'))
+    assert len(items) == 4
+    assert items[0]['author'] == 'Spokesperson'
+    assert items[0]['published_ts'] == parse_date('2025-10-02T07:12:00Z')
+
+
+def test_escaped_html_description_and_query_entities():
+    items = parse_feed(read_fixture('rss2_newswire_media.xml'))
+    gaza = items[3]
+    assert gaza['title'] == 'Gaza ceasefire talks resume in Cairo & Doha'
+    assert gaza['description'].startswith('<p>Mediators say')
+    assert items[0]['link'].endswith('?at_medium=RSS&at_campaign=rss')
+
+
+def test_limit_stops_reading_chunks():
+    content = read_fixture('rss2_wordpress_policy.xml')
+    chunks = [content[i:i + 512] for i in range(0, len(content), 512)]
+    consumed = []
+
+    def tracked():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    items = list(iter_feed_items(tracked(), limit=1))
+    assert len(items) == 1
+    assert len(consumed) < len(chunks)
+    assert parse_feed(content, limit=0) == []
+
+
+def test_all_fixtures_parse():
+    for path in glob.glob(os.path.join(FIXTURE_DIR, '*.xml')):
+        with open(path, 'rb') as f:
+            items = parse_feed(f.read())
+        assert items and all(item['title'] and item['link'] for item in items), path
+
+
+def test_parse_date_formats():
+    assert parse_date('Thu, 02 Oct 2025 13:51:40 GMT') == parse_date('2025-10-02T13:51:40Z')
+    assert parse_date('2025-10-02T15:51:40+02:00') == parse_date('2025-10-02T13:51:40')
+    assert parse_date('yesterday') == 0
+    assert parse_date(None) == 0
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+关键词匹配测试：KeywordMatcher / KeywordCategorizer 与逐词子串匹配结果一致
+"""
+
+import random
+
+from keyword_matcher import KeywordCategorizer, KeywordMatcher, get_matcher
+
+KEYWORDS = ['trump', 'trade', 'trade war', 'rare earth', 'rare', 'china', 'chin', 's&p', 'ai', '中美', '美国']
+TEXTS = [
+    'Trump threatens new trade war with China',
+    'Rare Earth exports halted',
+    'S&P 500 closes higher',
+    'Chinatown festival draws crowds',
+    '中美贸易谈判重启，美国代表团抵达北京',
+    'nothing relevant here',
+    '',
+    None,
+]
+
+
+def expected_matches(keywords, text):
+    text = (text or '').lower()
+    return {k for k in keywords if k in text}
+
+
+def test_search_and_matches_equal_substring_check():
+    matcher = KeywordMatcher(KEYWORDS)
+    for text in TEXTS:
+        expected = expected_matches(KEYWORDS, text)
+        assert matcher.search(text) == bool(expected), text
+        assert matcher.matches(text) == expected, text
+
+
+def test_random_texts_equal_substring_check():
+    rng = random.Random(7)
+    alphabet = 'abcdehinrstw &p'
+    matcher = KeywordMatcher(KEYWORDS)
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert matcher.matches(text) == expected_matches(KEYWORDS, text), text
+
+
+def test_case_sensitive():
+    matcher = KeywordMatcher(['Trump', 'AI'], case_sensitive=True)
+    assert matcher.matches('Trump said AI') == {'Trump', 'AI'}
+    assert matcher.matches('trump said ai') == set()
+
+
+def test_empty_keywords():
+    matcher = KeywordMatcher([])
+    assert not matcher.search('anything')
+    assert matcher.matches('anything') == set()
+
+
+def test_categorizer_shared_keywords():
+    categorizer = KeywordCategorizer({
+        'trade': ['tariff', 'trade'],
+        'china_us': ['china', 'tariff'],
+        'crypto': ['bitcoin'],
+    })
+    assert categorizer.categorize('New tariff on China') == {'trade', 'china_us'}
+    assert categorizer.categorize('Bitcoin rallies') == {'crypto'}
+    assert categorizer.categorize('weather report') == set()
+
+
+def test_get_matcher_is_cached():
+    assert get_matcher(['a', 'b']) is get_matcher(['b', 'a'])
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
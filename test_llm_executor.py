@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+LLM 执行器测试：结果顺序、异常与超时回退、RPM 限制
+"""
+
+import time
+
+from llm_executor import LLMExecutor, TokenBucket
+
+
+def test_results_keep_input_order():
+    def slow_square(x):
+        time.sleep(0.05 * (5 - x))
+        return x * x
+
+    executor = LLMExecutor(max_workers=5, rpm=600, tpm=10 ** 6, timeout=5)
+    assert executor.map(slow_square, [1, 2, 3, 4, 5]) == [1, 4, 9, 16, 25]
+
+
+def test_exception_uses_fallback():
+    def fail_on_odd(x):
+        if x % 2:
+            raise RuntimeError('boom')
+        return x
+
+    executor = LLMExecutor(max_workers=2, rpm=600, tpm=10 ** 6, timeout=5)
+    assert executor.map(fail_on_odd, [1, 2, 3, 4], fallback=lambda x: -x) == [-1, 2, -3, 4]
+    assert executor.map(fail_on_odd, [1, 2]) == [None, 2]
+
+
+def test_timeout_uses_fallback():
+    def maybe_hang(x):
+        if x == 'slow':
+            time.sleep(1.0)
+        return x.upper()
+
+    executor = LLMExecutor(max_workers=2, rpm=600, tpm=10 ** 6, timeout=0.2)
+    started = time.monotonic()
+    results = executor.map(maybe_hang, ['a', 'slow', 'b'], fallback=lambda x: 'fallback')
+    assert results == ['A', 'fallback', 'B']
+    assert time.monotonic() - started < 0.9
+
+
+def test_empty_items():
+    assert LLMExecutor(max_workers=2, rpm=60, tpm=1000, timeout=1).map(str, []) == []
+
+
+def test_token_bucket_blocks_when_empty():
+    bucket = TokenBucket(rate_per_minute=600)
+    bucket.tokens = 0
+    started = time.monotonic()
+    bucket.acquire()
+    # 每秒补充 10 个令牌，取出 1 个约需 0.1 秒
+    assert 0.05 < time.monotonic() - started < 0.5
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+摘要缓存测试：键的规范化、memoize、过期与容量淘汰
+"""
+
+import os
+import tempfile
+import time
+
+from summary_cache import SummaryCache, make_key
+
+
+def test_make_key_normalizes_whitespace():
+    assert make_key('v1', 'model', ' Hello\n  world ') == make_key('v1', 'model', 'Hello world')
+    assert make_key('v1', 'model', 'text') != make_key('v2', 'model', 'text')
+    assert make_key('v1', 'model', 'text') != make_key('v1', 'other', 'text')
+
+
+def test_memoize_calls_compute_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SummaryCache(os.path.join(tmp, 'cache.db'), ttl_hours=1, max_entries=10)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 'summary'
+
+        assert cache.memoize('v1', 'm', 'text', compute) == 'summary'
+        assert cache.memoize('v1', 'm', ' text ', compute) == 'summary'
+        assert len(calls) == 1
+        # 失败结果不缓存
+        assert cache.memoize('v1', 'm', 'other', lambda: '') == ''
+        assert cache.get('v1', 'm', 'other') is None
+        cache.close()
+
+
+def test_expired_entries_are_ignored_and_evicted():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SummaryCache(os.path.join(tmp, 'cache.db'), ttl_hours=1, max_entries=10)
+        cache.put('v1', 'm', 'old', 'stale')
+        with cache.conn:
+            cache.conn.execute('UPDATE summary_cache SET created_at = ?', (time.time() - 7200,))
+        assert cache.get('v1', 'm', 'old') is None
+        cache.evict()
+        assert cache.conn.execute('SELECT COUNT(*) FROM summary_cache').fetchone()[0] == 0
+        cache.close()
+
+
+def test_evict_keeps_most_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SummaryCache(os.path.join(tmp, 'cache.db'), ttl_hours=1, max_entries=2)
+        for i, text in enumerate(['a', 'b', 'c']):
+            cache.put('v1', 'm', text, text.upper())
+            with cache.conn:
+                cache.conn.execute('UPDATE summary_cache SET last_used = ? WHERE result = ?', (1000 + i, text.upper()))
+        cache.get('v1', 'm', 'a')
+        cache.evict()
+        assert cache.get('v1', 'm', 'a') == 'A'
+        assert cache.get('v1', 'm', 'b') is None
+        assert cache.get('v1', 'm', 'c') == 'C'
+        cache.close()
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            fn()
+            print(f"✅ {name}")
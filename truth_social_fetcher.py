@@ -9,7 +9,7 @@ Truth Social 抓取模块（基于第三方爬虫数据集）
   title, url, score, selftext, subreddit, author, created_utc, num_comments
 """
 
-import requests
+import http_client
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -48,7 +48,7 @@ def fetch_truth_social(dataset_url: str, *, limit: int = 10, token: Optional[str
         headers['Authorization'] = f'Bearer {token}'
 
     try:
-        resp = requests.get(dataset_url, headers=headers, timeout=15)
+        resp = http_client.get(dataset_url, headers=headers, timeout=15)
         if resp.status_code != 200:
             return []
         items = resp.json()
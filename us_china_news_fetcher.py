@@ -3,13 +3,15 @@
 专门抓取中美关系相关的新闻和动态
 """
 
-import requests
-import feedparser
 import time
 from typing import List, Dict
 from datetime import datetime, timedelta
 import re
 
+from feed_cache import fetch_feed
+from feed_parser import FEED_ITEMS_NAMESPACE, parse_feed_items
+from keyword_matcher import get_matcher
+
 
 def fetch_us_china_news(max_items: int = 5) -> List[Dict]:
     """
@@ -57,6 +59,7 @@ def fetch_us_china_news(max_items: int = 5) -> List[Dict]:
         "科技竞争", "tech competition", "供应链", "supply chain", "脱钩", "decoupling",
         "拜登", "Biden", "特朗普", "Trump", "习近平", "Xi Jinping"
     ]
+    matcher = get_matcher(keywords)
     
     all_news = []
     
@@ -65,39 +68,37 @@ def fetch_us_china_news(max_items: int = 5) -> List[Dict]:
             print(f"📰 抓取 {source['name']}...")
             
             # 解析 RSS 源
-            feed = feedparser.parse(source['url'])
+            entries = fetch_feed(source['url'], parse_feed_items, namespace=FEED_ITEMS_NAMESPACE)
             
-            if feed.bozo:
-                print(f"⚠️ {source['name']} RSS 解析失败")
+            if entries is None:
+                print(f"⚠️ {source['name']} RSS 获取失败")
                 continue
             
             items_added = 0
-            for entry in feed.entries[:max_items * 2]:  # 多取一些用于过滤
+            for entry in entries[:max_items * 2]:  # 多取一些用于过滤
                 if items_added >= max_items:
                     break
                 
                 # 检查是否包含中美关系关键词
-                title = entry.get('title', '').lower()
-                summary = entry.get('summary', '').lower()
+                title = (entry['title'] or '').lower()
+                summary = (entry['description'] or '').lower()
                 content = f"{title} {summary}"
                 
                 # 关键词匹配
-                if any(keyword.lower() in content for keyword in keywords):
+                if matcher.search(content, prepared=True):
                     # 解析发布时间
-                    pub_time = datetime.now()
-                    try:
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_time = datetime(*entry.published_parsed[:6])
-                    except:
-                        pass
+                    pub_time = datetime.fromtimestamp(entry['published_ts']) if entry['published_ts'] else datetime.now()
                     
+                    excerpt = entry['description'] or ''
+                    if len(excerpt) > 200:
+                        excerpt = excerpt[:200] + '...'
                     # 检查新鲜度（24小时内）
                     if datetime.now() - pub_time <= timedelta(hours=24):
                         news_item = {
-                            'title': entry.get('title', ''),
-                            'url': entry.get('link', ''),
-                            'selftext': entry.get('summary', '')[:200] + '...' if len(entry.get('summary', '')) > 200 else entry.get('summary', ''),
-                            'summary': entry.get('summary', '')[:200] + '...' if len(entry.get('summary', '')) > 200 else entry.get('summary', ''),
+                            'title': entry['title'] or '',
+                            'url': entry['link'] or '',
+                            'selftext': excerpt,
+                            'summary': excerpt,
                             'source': source['name'],
                             'category': source['category'],
                             'published_time': pub_time,
@@ -139,6 +140,7 @@ def filter_us_china_posts(posts: List[Dict]) -> List[Dict]:
         "semiconductor", "chip", "taiwan", "hong kong", "xinjiang", "belt and road",
         "biden", "trump", "xi jinping", "trade war", "tech war", "decoupling"
     ]
+    matcher = get_matcher(keywords)
     
     filtered_posts = []
     
@@ -148,7 +150,7 @@ def filter_us_china_posts(posts: List[Dict]) -> List[Dict]:
         subreddit = post.get('subreddit', '').lower()
         
         # 检查是否包含中美关系关键词
-        if any(keyword in title or keyword in content for keyword in keywords):
+        if matcher.search(f"{title}\n{content}", prepared=True):
             # 标记为中美关系相关
             post['category'] = '中美关系'
             post['subreddit'] = f"us-china-{post.get('subreddit', '')}"